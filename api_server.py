@@ -1,143 +1,450 @@
-# from flask import Flask, jsonify, request, send_file
-# from flask_cors import CORS
-# import pandas as pd
-# import json
-# from pathlib import Path
-# from domain_map import DOMAIN_ZH2EN
-
-# app = Flask(__name__)
-# CORS(app)  # 允许跨域请求
-
-# class DataAPI:
-#     def __init__(self):
-#         self.csv_file = "paper-process-4-vis.csv"
-#         self.data = []
-#         self.load_csv_data()
-    
-#     def load_csv_data(self):
-#         """加载CSV数据"""
-#         try:
-#             with open(self.csv_file, 'r', encoding='utf-8') as f:
-#                 lines = f.readlines()
-            
-#             for i, line in enumerate(lines[2:], start=3):
-#                 row = [cell.strip() for cell in line.split(',')]
-#                 if len(row) > 5 and row[0] and row[0].strip():
-#                     paper_data = {
-#                         'no': int(row[0].strip()),
-#                         'title': row[1].strip() if len(row) > 1 else '',
-#                         'venue': row[2].strip() if len(row) > 2 else '',
-#                         'year': row[3].strip() if len(row) > 3 else '',
-#                         'author': row[4].strip() if len(row) > 4 else '',
-#                         'analogy_process': [
-#                             row[5].strip() if len(row) > 5 else '', 
-#                             row[6].strip() if len(row) > 6 else '', 
-#                             row[7].strip() if len(row) > 7 else '', 
-#                             row[8].strip() if len(row) > 8 else ''
-#                         ],
-#                         'create_process': [
-#                             row[9].strip() if len(row) > 9 else '', 
-#                             row[10].strip() if len(row) > 10 else '', 
-#                             row[11].strip() if len(row) > 11 else '', 
-#                             row[12].strip() if len(row) > 12 else '', 
-#                             row[13].strip() if len(row) > 13 else '', 
-#                             row[14].strip() if len(row) > 14 else '', 
-#                             row[15].strip() if len(row) > 15 else ''
-#                         ],
-#                         'representation': [
-#                             row[16].strip() if len(row) > 16 else '', 
-#                             row[17].strip() if len(row) > 17 else '', 
-#                             row[18].strip() if len(row) > 18 else '', 
-#                             row[19].strip() if len(row) > 19 else '', 
-#                             row[20].strip() if len(row) > 20 else '', 
-#                             row[21].strip() if len(row) > 21 else ''
-#                         ],
-#                         'automation': row[22].strip() if len(row) > 22 else '',
-#                         'application': row[23].strip() if len(row) > 23 else '',
-#                         'domain': row[24].strip() if len(row) > 24 else ''
-#                     }
-#                     self.data.append(paper_data)
-            
-#             print(f"✅ API服务器加载了 {len(self.data)} 篇论文数据")
-            
-#         except Exception as e:
-#             print(f"❌ API数据加载失败: {e}")
-    
-#     def get_papers_data(self):
-#         """获取论文数据"""
-#         return self.data
-    
-#     def get_statistics(self):
-#         """获取统计数据"""
-#         if not self.data:
-#             return {}
-        
-#         venues = {}
-#         years = {}
-#         auto_levels = {}
-        
-#         for paper in self.data:
-#             venues[paper['venue']] = venues.get(paper['venue'], 0) + 1
-#             years[paper['year']] = years.get(paper['year'], 0) + 1
-#             auto_levels[paper['automation']] = auto_levels.get(paper['automation'], 0) + 1
-        
-#         return {
-#             'total_papers': len(self.data),
-#             'venues': venues,
-#             'years': years,
-#             'auto_levels': auto_levels
-#         }
-
-# # 初始化数据API
-# data_api = DataAPI()
-
-# @app.route('/api/papers', methods=['GET'])
-# def get_papers():
-#     """获取所有论文数据"""
-#     return jsonify(data_api.get_papers_data())
-
-# @app.route('/api/statistics', methods=['GET'])
-# def get_statistics():
-#     """获取统计数据"""
-#     return jsonify(data_api.get_statistics())
-
-# @app.route('/api/generate-image', methods=['POST'])
-# def generate_image():
-#     """生成图片"""
-#     try:
-#         from complete_41_papers_generator import Complete41PapersTableGenerator
-        
-#         # 获取参数
-#         data = request.get_json()
-#         image_type = data.get('type', 'publication')  # publication 或 presentation
-        
-#         # 创建生成器
-#         generator = Complete41PapersTableGenerator("paper-process-4-vis.csv")
-        
-#         # 生成图片
-#         if image_type == 'publication':
-#             filename = "complete_41_papers_publication.png"
-#             generator.create_publication_ready_image(filename)
-#         else:
-#             filename = "complete_41_papers_presentation.png"
-#             generator.create_presentation_image(filename)
-        
-#         # 返回图片文件
-#         return send_file(filename, mimetype='image/png')
-        
-#     except Exception as e:
-#         return jsonify({'error': str(e)}), 500
-
-# @app.route('/')
-# def index():
-#     """返回HTML页面"""
-#     return send_file('表格生成器.html')
-
-# if __name__ == '__main__':
-#     print("🚀 启动API服务器...")
-#     print("📊 访问 http://localhost:8081 查看表格")
-#     print("🔗 API端点:")
-#     print("   GET /api/papers - 获取论文数据")
-#     print("   GET /api/statistics - 获取统计数据")
-#     print("   POST /api/generate-image - 生成图片")
-#     app.run(debug=True, host='0.0.0.0', port=8081) 
\ No newline at end of file
+import os
+import threading
+from flask import Flask, Response, jsonify, request, send_file
+from flask_cors import CORS
+from bibtex_citation_manager import PaperCitationManager
+from dataset_cache import load_dataset
+from wire_format import COLUMNAR_FORMAT, encode_columnar
+from encoded_response import IDENTITY, PreencodedJSON
+from file_watcher import FileWatcher
+from flag_query import FLAG_NAMES, FlagQueryError, compile_expression
+from paper_analytics import ANALYTICS_SECTIONS, FlagAnalytics
+from paper_index import QUERY_PARAMS, PaperIndex, PaperQuery, QueryError
+from paper_statistics import PaperStatistics
+from paper_store import PaperStore, diff_stores
+from render_cache import RenderCache, render_key
+from render_config import GENERATOR_VERSION, IMAGE_PRESETS, THUMBNAIL_WIDTH
+from render_jobs import DONE, FAILED, RenderJobQueue
+from render_worker import RenderWorkerPool
+
+app = Flask(__name__)
+CORS(app)  # 允许跨域请求
+
+class DatasetSnapshot:
+    """某一版本的数据集及其派生结果（创建后不再修改，整体替换）"""
+
+    __slots__ = ('version', 'store', 'citation_manager', 'data', 'statistics', 'dataset_hash', 'index',
+                 'analytics', 'papers_json', 'papers_columnar')
+
+    def __init__(self, version, store, citation_manager, data, statistics):
+        self.version = version
+        self.store = store
+        self.dataset_hash = store.content_hash()
+        self.citation_manager = citation_manager
+        self.data = data
+        self.statistics = statistics
+        self.index = PaperIndex(store, citation_manager, version)
+        self.analytics = FlagAnalytics(store, version)
+        # 完整论文列表的JSON（及压缩版本）每个版本只生成一次
+        self.papers_json = PreencodedJSON(data, f"papers-{self.dataset_hash[:32]}")
+        self.papers_columnar = PreencodedJSON(
+            lambda: encode_columnar(store, self.index.flags.masks),
+            f"papers-columnar-{self.dataset_hash[:32]}")
+
+
+class DataAPI:
+    def __init__(self, csv_file="paper-process-4-vis.csv"):
+        self.csv_file = csv_file
+        empty = PaperStore.from_rows([], [], source=self.csv_file)
+        self.snapshot = DatasetSnapshot(0, empty, PaperCitationManager([]), [],
+                                        PaperStatistics.from_store(empty))
+        self.watcher = None
+        self._reload_lock = threading.Lock()
+        self.load_csv_data()
+
+    @property
+    def store(self):
+        return self.snapshot.store
+
+    @property
+    def data(self):
+        return self.snapshot.data
+
+    def load_csv_data(self):
+        """加载CSV数据（共享列式存储，命中磁盘缓存时不重新解析）"""
+        try:
+            with self._reload_lock:
+                store, citation_manager = load_dataset(self.csv_file)
+                diff = self._swap(store, citation_manager)
+
+            print(f"✅ API服务器加载了 {len(store)} 篇论文数据")
+            return diff
+
+        except Exception as e:
+            print(f"❌ API数据加载失败: {e}")
+
+    def reload(self):
+        """重新加载数据文件（由文件监视线程调用）"""
+        diff = self.load_csv_data()
+        if diff is not None:
+            print(f"🔄 数据已更新 (v{self.snapshot.version}): 新增{len(diff.added)}篇, "
+                  f"修改{len(diff.changed)}篇, 删除{len(diff.removed)}篇, 未变{diff.unchanged}篇")
+        return diff
+
+    def _swap(self, store, citation_manager):
+        """构建新快照后一次性替换引用，读请求始终看到完整的某一版本"""
+        old = self.snapshot
+        diff = diff_stores(old.store, store)
+
+        # 未变化的行直接复用上一版本的字典
+        previous_rows = dict(zip(old.store.row_fingerprints(), old.data))
+        data = [previous_rows.get(fp) or store.record_dict(i)
+                for i, fp in enumerate(store.row_fingerprints())]
+
+        # 统计按行级差异增量更新
+        version = old.version + 1
+        statistics = old.statistics.apply_diff(old.store, store, diff, version)
+        self.snapshot = DatasetSnapshot(version, store, citation_manager, data, statistics)
+        return diff
+
+    def start_watching(self, interval=1.0):
+        """监视CSV文件，修改后在后台重新加载"""
+        if self.watcher is None:
+            self.watcher = FileWatcher(self.csv_file, self.reload, interval).start()
+        return self.watcher
+
+    def get_papers_data(self):
+        """获取论文数据"""
+        return self.snapshot.data
+
+    def query_papers(self, query, columnar=False):
+        """按二级索引筛选、排序、分页（columnar=True 时论文列表用列式格式）"""
+        snapshot = self.snapshot
+        page = snapshot.index.query(query)
+        if columnar:
+            papers = encode_columnar(snapshot.store, snapshot.index.flags.masks, page.rows)
+        else:
+            papers = [snapshot.data[i] for i in page.rows]
+        return {
+            'version': snapshot.version,
+            'total': page.total,
+            'papers': papers,
+            'next_cursor': page.next_cursor,
+        }
+
+    def query_flags(self, expression, limit=50):
+        """按标志位表达式筛选：返回命中数和前 limit 篇论文"""
+        snapshot = self.snapshot
+        flags = snapshot.index.flags
+        result = {
+            'version': snapshot.version,
+            'expression': compile_expression(expression).normalized,
+            'count': flags.count(expression),
+            'total_papers': len(snapshot.store),
+        }
+        if limit:
+            result['papers'] = [snapshot.data[i] for i in flags.rows(expression)[:limit]]
+        return result
+
+    def search_papers(self, text, limit=20):
+        """全文检索，按相关度排序"""
+        snapshot = self.snapshot
+        rows, scores, total = snapshot.index.search.search(text, limit)
+        return {
+            'version': snapshot.version,
+            'query': text,
+            'total': total,
+            'results': [dict(snapshot.data[i], score=round(float(score), 4))
+                        for i, score in zip(rows, scores)],
+        }
+
+    def get_statistics(self):
+        """获取统计数据（带数据集版本号，结果已缓存）"""
+        return self.snapshot.statistics.to_dict()
+
+# 预热的渲染进程数
+RENDER_WORKERS = min(2, os.cpu_count() or 1)
+
+# 应用状态只在服务进程中创建：渲染进程以 spawn 方式启动时会把本脚本作为 __mp_main__ 重新导入，
+# 它们只用到 render_worker，不需要再加载数据集、监视文件或创建自己的进程池和任务队列
+if __name__ != '__mp_main__':
+    # 初始化数据API，并在CSV修改后自动重新加载
+    data_api = DataAPI()
+    data_api.start_watching()
+
+    # 渲染结果缓存
+    render_cache = RenderCache()
+
+    # 预热的渲染进程：启动时就导入绘图库、解析字体、加载图标，首次请求不再额外等待
+    render_workers = RenderWorkerPool(data_api.csv_file, max_workers=RENDER_WORKERS)
+
+    # 渲染任务队列（每个线程把任务交给一个渲染进程并等待结果；
+    # 已结束的任务在内存中保留图片字节，数量不宜过多）
+    render_jobs = RenderJobQueue(max_workers=RENDER_WORKERS, max_finished=32)
+
+def start_render_workers(use_reloader=True):
+    """
+    启动并预热渲染进程（由启动脚本调用；未调用时渲染进程在第一次渲染时启动）
+    debug 模式下 werkzeug 的重载器会再启动一个子进程处理请求，渲染进程只在该子进程中预热
+    """
+    if not use_reloader or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        render_workers.start()
+
+def _preencoded_response(encoded):
+    """按 Accept-Encoding 返回预先编码好的JSON；ETag 匹配时返回304，不读取内容"""
+    encoding = encoded.negotiate(request.accept_encodings)
+    etag = encoded.etag(encoding)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(encoded.body(encoding), mimetype='application/json')
+        if encoding != IDENTITY:
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    # 允许缓存，但每次使用前都向服务器确认
+    response.cache_control.no_cache = True
+    return response
+
+@app.route('/api/papers', methods=['GET'])
+def get_papers():
+    """
+    获取论文数据
+    不带参数时返回全部论文；带筛选/排序/分页参数时返回一页结果：
+    year_from, year_to, venue, automation, domain_category（可重复）, q,
+    flags（标志位表达式）, sort=year|citation|venue, order=asc|desc, limit, cursor
+    format=columnar 时论文列表改用列式格式（见 wire_format）；
+    其他参数（如防缓存的 _=时间戳）不影响返回结构
+    """
+    output_format = request.args.get('format', 'rows')
+    if output_format not in ('rows', COLUMNAR_FORMAT):
+        return jsonify({'error': f"不支持的格式: {output_format!r}"}), 400
+    columnar = output_format == COLUMNAR_FORMAT
+    if not any(name in request.args for name in QUERY_PARAMS):
+        snapshot = data_api.snapshot
+        return _preencoded_response(snapshot.papers_columnar if columnar else snapshot.papers_json)
+    try:
+        query = PaperQuery.from_args(request.args)
+        return jsonify(data_api.query_papers(query, columnar))
+    except QueryError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/flag-query', methods=['GET'])
+def flag_query():
+    """
+    标志位布尔查询，如 expr=Ret and Map and not Fab
+    同名标志用限定名区分（analogy.Eva / create.Eva，create.Vis / repr.Vis）；
+    limit=0 时只返回命中数
+    """
+    expression = request.args.get('expr', '')
+    try:
+        limit = max(0, int(request.args.get('limit', 50)))
+        return jsonify(data_api.query_flags(expression, limit))
+    except (FlagQueryError, ValueError) as e:
+        return jsonify({'error': str(e), 'flags': FLAG_NAMES}), 400
+
+@app.route('/api/analytics', methods=['GET'])
+def get_analytics():
+    """
+    标志位交叉分析：共现矩阵、条件比例 P(列|行)、标志×年份、标志×领域大类
+    section=cooccurrence|conditional|by_year|by_domain（可重复）只返回指定部分
+    """
+    sections = request.args.getlist('section') or ANALYTICS_SECTIONS
+    unknown = [section for section in sections if section not in ANALYTICS_SECTIONS]
+    if unknown:
+        return jsonify({'error': f"未知的分析项: {', '.join(unknown)}",
+                        'sections': ANALYTICS_SECTIONS}), 400
+    snapshot = data_api.snapshot
+    response = jsonify(snapshot.analytics.to_dict(sections))
+    # 返回内容包含版本号，ETag 也要随版本变化
+    response.set_etag(f"analytics-{snapshot.dataset_hash}-v{snapshot.version}-{'.'.join(sections)}")
+    return response.make_conditional(request)
+
+@app.route('/api/search', methods=['GET'])
+def search_papers():
+    """
+    全文检索标题、作者、会议和领域：q=查询词（按前缀匹配，多个词需同时命中），limit=返回条数
+    """
+    try:
+        limit = max(1, min(int(request.args.get('limit', 20)), 200))
+    except ValueError:
+        return jsonify({'error': 'limit 必须是整数'}), 400
+    return jsonify(data_api.search_papers(request.args.get('q', ''), limit))
+
+@app.route('/api/statistics', methods=['GET'])
+def get_statistics():
+    """获取统计数据（数据未变化时返回304）"""
+    snapshot = data_api.snapshot
+    response = jsonify(snapshot.statistics.to_dict())
+    # 返回内容包含版本号：内容相同但版本不同时也要用不同的ETag
+    response.set_etag(f"stats-{snapshot.dataset_hash}-v{snapshot.version}")
+    return response.make_conditional(request)
+
+def _output_key(snapshot, image_type, output):
+    """某个快照下某种输出（DPI 或 'thumbnail'）的缓存键"""
+    image_width, image_height, _ = IMAGE_PRESETS[image_type]
+    return render_key(dataset=snapshot.dataset_hash, type=image_type,
+                      size=[image_width, image_height], dpi=output,
+                      generator=GENERATOR_VERSION)
+
+class RenderParamError(ValueError):
+    """渲染参数无效"""
+
+def _render_request(params):
+    """解析渲染参数，返回 (当前快照, 图片类型, 输出, 缓存键)；参数无效时抛出 RenderParamError"""
+    image_type = params.get('type', 'publication')  # publication 或 presentation
+    if image_type != 'publication':
+        image_type = 'presentation'
+    _, _, dpi = IMAGE_PRESETS[image_type]
+
+    # 输出：预设DPI、更低的DPI，或网页预览缩略图
+    if str(params.get('thumbnail', '')).lower() in ('1', 'true', 'yes'):
+        output = 'thumbnail'
+    elif params.get('dpi') not in (None, ''):
+        try:
+            output = int(str(params['dpi']))
+        except ValueError:
+            output = 0
+        if not 1 <= output <= dpi:
+            raise RenderParamError(f"参数 dpi 必须是 1 到 {dpi} 之间的整数: {params['dpi']!r}")
+    else:
+        output = dpi
+
+    # 同一快照内数据不变，渲染结果由输入唯一确定
+    snapshot = data_api.snapshot
+    return snapshot, image_type, output, _output_key(snapshot, image_type, output)
+
+def _cache_put(key, data):
+    try:
+        render_cache.put(key, data)
+    except OSError as e:
+        print(f"⚠️ 渲染结果写入缓存失败: {e}")
+
+def _render_image(snapshot, image_type, output, key):
+    """
+    在渲染线程中执行：交给渲染进程在内存中渲染并返回PNG字节，结果只通过缓存层持久化
+    低DPI图片和缩略图由完整分辨率的像素缩小得到，不单独渲染；
+    绘图库只在渲染进程中加载，API进程不承担这部分开销
+    """
+    data = render_cache.get(key)
+    if data is not None:
+        return data
+
+    _, _, dpi = IMAGE_PRESETS[image_type]
+    if output != dpi:
+        # 完整分辨率已在缓存中：直接缩小派生
+        base = render_cache.get(_output_key(snapshot, image_type, dpi))
+        if base is not None:
+            if output == 'thumbnail':
+                data = render_workers.downsample(base, width=THUMBNAIL_WIDTH)
+            else:
+                data = render_workers.downsample(base, scale=output / dpi, dpi=output)
+            _cache_put(key, data)
+            return data
+
+    # 单次渲染同时得到完整分辨率、所需DPI和缩略图；
+    # 渲染进程按哈希从磁盘缓存取数据，只有取不到该版本时才发送快照中的数据
+    dpis = [dpi] if output in (dpi, 'thumbnail') else [dpi, output]
+    outputs = render_workers.render_resolutions(
+        snapshot.dataset_hash, IMAGE_PRESETS[image_type], dpis, THUMBNAIL_WIDTH,
+        dataset=(snapshot.store, snapshot.citation_manager))
+    for name, data in outputs.items():
+        _cache_put(_output_key(snapshot, image_type, name), data)
+    return outputs[output]
+
+def _image_response(data, etag):
+    """直接返回内存中的图片字节"""
+    response = Response(data, mimetype='image/png')
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+def _submit_render(params):
+    """提交渲染任务（相同参数的并发请求共用一个任务）"""
+    snapshot, image_type, output, key = _render_request(params)
+    job = render_jobs.submit(key, lambda: _render_image(snapshot, image_type, output, key),
+                             params={'type': image_type, 'output': output,
+                                     'dataset_version': snapshot.version})
+    return job
+
+def _job_response(job, status=200):
+    info = job.to_dict()
+    info['status_url'] = f"/api/render-jobs/{job.id}"
+    info['result_url'] = f"/api/render-jobs/{job.id}/result"
+    return jsonify(info), status
+
+@app.route('/api/generate-image', methods=['GET', 'POST'])
+def generate_image():
+    """生成图片（数据和参数都未变化时直接返回缓存结果，支持ETag/304）"""
+    try:
+        # 获取参数
+        params = request.get_json(silent=True) or request.args
+        snapshot, image_type, output, etag = _render_request(params)
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
+        # 命中缓存时直接返回缓存内容（已读入内存，不受并发淘汰影响）
+        data = render_cache.get(etag)
+        if data is not None:
+            return _image_response(data, etag)
+
+        # 交给渲染队列，等待结果后直接返回内存中的图片
+        job = _submit_render(params)
+        return _image_response(render_jobs.wait(job), etag)
+
+    except RenderParamError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/render-jobs', methods=['POST'])
+def submit_render_job():
+    """提交异步渲染任务，立即返回任务ID"""
+    params = request.get_json(silent=True) or request.args
+    try:
+        job = _submit_render(params)
+    except RenderParamError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    return _job_response(job, 202)
+
+@app.route('/api/render-jobs/metrics', methods=['GET'])
+def render_job_metrics():
+    """渲染队列深度和渲染耗时"""
+    metrics = render_jobs.metrics()
+    metrics['render_processes'] = render_workers.status()
+    return jsonify(metrics)
+
+@app.route('/api/render-jobs/<job_id>', methods=['GET'])
+def get_render_job(job_id):
+    """查询渲染任务状态"""
+    job = render_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': '任务不存在或已过期'}), 404
+    return _job_response(job)
+
+@app.route('/api/render-jobs/<job_id>/result', methods=['GET'])
+def get_render_job_result(job_id):
+    """下载渲染结果"""
+    job = render_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': '任务不存在或已过期'}), 404
+    if job.status == FAILED:
+        return jsonify({'error': job.error}), 500
+    if job.status != DONE:
+        return _job_response(job, 202)
+    return _image_response(job.result, job.key)
+
+@app.route('/')
+def index():
+    """返回HTML页面"""
+    return send_file('表格生成器.html')
+
+if __name__ == '__main__':
+    print("🚀 启动API服务器...")
+    print("📊 访问 http://localhost:8081 查看表格")
+    print("🔗 API端点:")
+    print("   GET /api/papers - 获取论文数据（可选筛选、排序、游标分页）")
+    print("   GET /api/flag-query?expr=... - 标志位布尔查询")
+    print("   GET /api/search?q=... - 全文检索")
+    print("   GET /api/statistics - 获取统计数据")
+    print("   GET /api/analytics - 标志位共现与交叉分析")
+    print("   POST /api/generate-image - 生成图片（可选 dpi=降低分辨率, thumbnail=1 缩略图）")
+    print("   POST /api/render-jobs - 提交异步渲染任务")
+    print("   GET /api/render-jobs/<id> - 查询任务状态")
+    print("   GET /api/render-jobs/<id>/result - 下载渲染结果")
+    print("   GET /api/render-jobs/metrics - 渲染队列指标")
+    start_render_workers()
+    app.run(debug=True, host='0.0.0.0', port=8081)
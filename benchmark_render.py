@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+表格渲染基准测试
+把数据集平铺到指定行数，分别用逐个Rectangle和批量集合绘制单元格，输出每1000行的渲染耗时
+
+用法: python benchmark_render.py [CSV文件] [行数 ...]
+"""
+
+import io
+import sys
+import time
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from complete_41_papers_generator import Complete41PapersTableGenerator
+from dataset_cache import load_dataset
+from paper_store import PaperStore
+
+# 与 _draw_complete_table_data 中的布局保持一致
+ROW_HEIGHT = 1.6
+START_Y = 70
+DPI = 100
+
+
+def tiled_store(store: PaperStore, rows: int) -> PaperStore:
+    """把数据集重复平铺到指定行数"""
+    repeats = -(-rows // len(store))
+    records = (store.records * repeats)[:rows]
+    flags = np.tile(store.flags, (repeats, 1))[:rows]
+    return PaperStore(records, flags, source=store.source)
+
+
+def render_seconds(generator: Complete41PapersTableGenerator, rows: int) -> float:
+    """渲染表头和数据行到内存，返回耗时（秒）"""
+    bottom = START_Y - rows * ROW_HEIGHT - 2
+    height = 22 * (80 - bottom) / 80
+    start = time.perf_counter()
+    fig = Figure(figsize=(16, height), dpi=DPI)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.set_xlim(0, 84)
+    ax.set_ylim(bottom, 80)
+    ax.axis('off')
+    generator._draw_complete_table_headers(ax)
+    generator._draw_complete_table_data(ax)
+    fig.savefig(io.BytesIO(), format='png', dpi=DPI)
+    return time.perf_counter() - start
+
+
+def main():
+    csv_file = sys.argv[1] if len(sys.argv) > 1 else "paper-process-4-vis-2.csv"
+    row_counts = [int(n) for n in sys.argv[2:]] or [41, 1000, 2000]
+
+    store, citation_manager = load_dataset(csv_file)
+    print(f"⏱️ 渲染基准测试 ({csv_file}, DPI={DPI})")
+    print("=" * 50)
+    print(f"{'行数':>8} {'逐个绘制(s)':>12} {'批量绘制(s)':>12} {'批量 ms/1k行':>14}")
+
+    for rows in row_counts:
+        generator = Complete41PapersTableGenerator(
+            csv_file, dataset=(tiled_store(store, rows), citation_manager))
+        timings = []
+        for batched in (False, True):
+            generator.batch_cells = batched
+            timings.append(render_seconds(generator, rows))
+        print(f"{rows:>8} {timings[0]:>12.2f} {timings[1]:>12.2f} {timings[1] / rows * 1e6:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
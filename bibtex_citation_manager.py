@@ -5,9 +5,31 @@ BibTeX风格的自动引用序号管理器
 """
 
 import re
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from dataclasses import dataclass
-from datetime import datetime
+
+_WORD_RE = re.compile(r'\b[a-zA-Z]+\b')
+
+# 标题首词中跳过的冠词和虚词
+ARTICLES = frozenset({'a', 'an', 'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'})
+
+# LaTeX风格的键还跳过常见的泛化词
+LATEX_SKIP_WORDS = ARTICLES | frozenset({
+    'design', 'analysis', 'study', 'review', 'system', 'method', 'approach', 'framework', 'model',
+    'tool', 'application', 'evaluation', 'investigation', 'examination', 'exploration',
+    'development', 'implementation', 'creation', 'generation', 'production', 'construction',
+    'building', 'making', 'creating', 'developing', 'implementing', 'evaluating', 'analyzing',
+    'studying', 'reviewing', 'examining', 'exploring', 'investigating'})
+
+
+def collision_suffix(index: int) -> str:
+    """第 index 个（从0开始）重名键的后缀：a, b, ..., z, aa, ab, ..."""
+    suffix = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        suffix = chr(ord('a') + remainder) + suffix
+    return suffix
 
 @dataclass
 class Citation:
@@ -24,9 +46,11 @@ class BibTeXCitationManager:
     """BibTeX风格的引用管理器"""
     
     def __init__(self):
-        self.citations: Dict[str, Citation] = {}
-        self.citation_order: List[str] = []  # 按首次引用顺序排列
+        self.citations: Dict[str, Citation] = {}        # 引用键 -> 引用（含序号）
+        self.citation_order: List[str] = []             # 按首次引用顺序排列，第 n 号引用位于下标 n-1
         self.next_citation_number = 1
+        self._identities: Dict[Tuple[str, str, str], str] = {}  # (标题, 作者, 年份) -> 引用键
+        self._collisions: Dict[str, int] = {}           # 基础键 -> 已使用的后缀个数
         
     def generate_citation_key(self, title: str, authors: str, year: str) -> str:
         """
@@ -38,11 +62,10 @@ class BibTeXCitationManager:
         last_name = first_author.split()[-1].lower() if first_author else "unknown"
         
         # 提取标题首词（去除冠词）
-        title_words = re.findall(r'\b[a-zA-Z]+\b', title.lower())
+        title_words = _WORD_RE.findall(title.lower())
         if title_words:
             # 跳过冠词
-            articles = {'a', 'an', 'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
-            first_word = next((word for word in title_words if word not in articles), title_words[0])
+            first_word = next((word for word in title_words if word not in ARTICLES), title_words[0])
         else:
             first_word = "paper"
         
@@ -63,11 +86,10 @@ class BibTeXCitationManager:
         clean_year = year.split('.')[0] if '.' in year else year
         
         # 从标题中提取关键词（通常是第一个有意义的词）
-        title_words = re.findall(r'\b[a-zA-Z]+\b', title.lower())
+        title_words = _WORD_RE.findall(title.lower())
         if title_words:
             # 跳过冠词和常见词
-            skip_words = {'a', 'an', 'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'design', 'analysis', 'study', 'review', 'system', 'method', 'approach', 'framework', 'model', 'tool', 'application', 'evaluation', 'investigation', 'examination', 'exploration', 'development', 'implementation', 'creation', 'generation', 'production', 'construction', 'building', 'making', 'creating', 'developing', 'implementing', 'evaluating', 'analyzing', 'studying', 'reviewing', 'examining', 'exploring', 'investigating'}
-            first_word = next((word for word in title_words if word not in skip_words), title_words[0])
+            first_word = next((word for word in title_words if word not in LATEX_SKIP_WORDS), title_words[0])
         else:
             first_word = "paper"
         
@@ -75,18 +97,30 @@ class BibTeXCitationManager:
         key = f"{last_name}{clean_year}{first_word}"
         return key
     
-    def add_citation(self, title: str, authors: str, venue: str, year: str) -> str:
+    def add_citation(self, title: str, authors: str, venue: str, year: str,
+                     key: Optional[str] = None) -> str:
         """
         添加新的引用条目
+        同一篇论文（标题、作者、年份相同）重复添加时返回已有的键；
+        不同论文生成了相同的键时，后添加的依次加后缀 a, b, ...（如 smith2020analogya）
+        
+        Args:
+            key: 基础引用键（默认由 generate_citation_key 生成）
         
         Returns:
-            str: 生成的引用键
+            str: 实际使用的引用键
         """
-        key = self.generate_citation_key(title, authors, year)
+        identity = (title.strip().casefold(), authors.strip().casefold(), str(year).strip())
+        existing = self._identities.get(identity)
+        if existing is not None:
+            return existing
         
-        # 如果键已存在，返回现有键
-        if key in self.citations:
-            return key
+        base = key or self.generate_citation_key(title, authors, year)
+        key = base
+        while key in self.citations:
+            used = self._collisions.get(base, 0)
+            self._collisions[base] = used + 1
+            key = base + collision_suffix(used)
         
         # 创建新的引用条目
         citation = Citation(
@@ -101,10 +135,25 @@ class BibTeXCitationManager:
         
         self.citations[key] = citation
         self.citation_order.append(key)
+        self._identities[identity] = key
         self.next_citation_number += 1
         
         return key
     
+    def add_citations(self, entries: Iterable[Dict]) -> List[str]:
+        """
+        批量添加引用（按给定顺序分配序号）
+        
+        Args:
+            entries: 含 title / authors / venue / year 的字典，可选 key 指定基础引用键
+        
+        Returns:
+            List[str]: 与 entries 一一对应的引用键
+        """
+        return [self.add_citation(entry['title'], entry['authors'], entry.get('venue', ''),
+                                  entry.get('year', ''), key=entry.get('key'))
+                for entry in entries]
+    
     def get_citation_number(self, key: str) -> int:
         """获取引用序号"""
         if key in self.citations:
@@ -113,9 +162,8 @@ class BibTeXCitationManager:
     
     def get_citation_by_number(self, number: int) -> Optional[Citation]:
         """根据序号获取引用"""
-        for citation in self.citations.values():
-            if citation.citation_number == number:
-                return citation
+        if 1 <= number <= len(self.citation_order):
+            return self.citations[self.citation_order[number - 1]]
         return None
     
     def get_all_citations_ordered(self) -> List[Citation]:
@@ -185,34 +233,33 @@ class PaperCitationManager:
         self._initialize_citations(csv_data)
     
     def _initialize_citations(self, csv_data: List[Dict]):
-        """从CSV数据初始化引用"""
-        for paper in csv_data:
-            if paper.get('title') and paper.get('author'):
-                # 使用LaTeX风格的引用键
-                key = self.bibtex_manager.generate_latex_style_key(
-                    title=paper['title'],
-                    authors=paper['author'],
-                    year=paper.get('year', '')
-                )
-                # 添加到BibTeX管理器
-                self.bibtex_manager.add_citation(
-                    title=paper['title'],
-                    authors=paper['author'],
-                    venue=paper.get('venue', ''),
-                    year=paper.get('year', '')
-                )
-                self.paper_citations[paper['no']] = key
+        """从CSV数据初始化引用（以LaTeX风格的键登记，记录实际使用的键）"""
+        papers = [paper for paper in csv_data if paper.get('title') and paper.get('author')]
+        entries = [{
+            'title': paper['title'],
+            'authors': paper['author'],
+            'venue': paper.get('venue', ''),
+            'year': paper.get('year', ''),
+            'key': self.bibtex_manager.generate_latex_style_key(
+                title=paper['title'],
+                authors=paper['author'],
+                year=paper.get('year', '')
+            ),
+        } for paper in papers]
+        keys = self.bibtex_manager.add_citations(entries)
+        for paper, key in zip(papers, keys):
+            self.paper_citations[str(paper['no'])] = key
     
     def get_paper_citation_number(self, paper_no: str) -> int:
         """获取论文的引用序号"""
-        key = self.paper_citations.get(paper_no)
+        key = self.paper_citations.get(str(paper_no))
         if key:
             return self.bibtex_manager.get_citation_number(key)
         return 0
     
     def get_paper_citation_key(self, paper_no: str) -> str:
         """获取论文的引用键"""
-        return self.paper_citations.get(paper_no, "")
+        return self.paper_citations.get(str(paper_no), "")
     
     def get_all_papers_with_citations(self) -> List[Tuple[str, int, str]]:
         """获取所有论文及其引用信息"""
@@ -1,34 +1,215 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
+import argparse
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib.image as mpimg
 from matplotlib.patches import Rectangle
+from matplotlib.collections import PathCollection
+from matplotlib.path import Path as MplPath
+from matplotlib.artist import Artist, allow_rasterization
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+from matplotlib.text import Text
+from matplotlib.transforms import Bbox
 import numpy as np
 from pathlib import Path
-import seaborn as sns
-from matplotlib.font_manager import FontProperties
-from datetime import datetime
+from matplotlib.font_manager import fontManager
+from functools import lru_cache
+from PIL import Image
 from domain_map import DOMAIN_ZH2EN
 from bibtex_citation_manager import PaperCitationManager
+from paper_store import PaperStore, ANALOGY_SLICE, CREATE_SLICE, REPR_SLICE
+from paper_analytics import FlagAnalytics
+from paper_statistics import PaperStatistics
+from dataset_cache import default_cache, load_dataset
+from icon_atlas import IconAtlas
+from text_metrics import TextMeasurer
+from render_config import IMAGE_PRESETS, THUMBNAIL_WIDTH
 from matplotlib.offsetbox import OffsetImage, AnnotationBbox
 
+# 支持的输出格式
+VARIANT_FORMATS = ('png', 'pdf', 'svg')
+
+# 默认输出的图片变体：(图片类型, 格式)
+DEFAULT_VARIANTS = [('publication', 'png'), ('presentation', 'png')]
+
+# 默认布局（纵坐标0-80、行高1.6）每页最多容纳的行数
+ROWS_PER_PAGE = 41
+
+# Auto Level图标长边尺寸（磅）
+ICON_SIZE_POINTS = 20
+
+# 表格字体（逐个设置在图形内的文本上，不修改全局 rcParams）
+FONT_FAMILY = ['SimHei', 'Arial Unicode MS', 'DejaVu Sans']
+# 基准字号（磅），决定图形四周的边距
+FONT_SIZE = 8
+
+# 坐标范围（数据单位）
+X_RANGE = 84
+Y_RANGE = 80
+
+# 图形四周边距（英寸，与 tight_layout 默认的 1.08 倍字号一致）和保存时的额外留白
+FIGURE_MARGIN = 1.08 * FONT_SIZE / 72
+SAVE_PADDING = 0.2
+
+# 单元格内文字的左右留白（数据单位）
+CELL_TEXT_PADDING = 0.3
+# 多行文字的最小行距（字号的倍数），决定单元格最多容纳几行
+MIN_LINE_SPACING = 0.9
+
+
+@lru_cache(maxsize=None)
+def _font_family():
+    """FONT_FAMILY 中已安装的字体（避免对缺失字体反复告警），都没有时退回默认无衬线字体"""
+    installed = {font.name for font in fontManager.ttflist}
+    return [name for name in FONT_FAMILY if name in installed] or ['sans-serif']
+
+class _CellCollection(PathCollection):
+    """
+    表格单元格集合：所有单元格共享单位矩形路径，每个单元格一个缩放+平移矩阵，
+    与逐个添加Rectangle时的坐标变换完全相同，因此输出像素一致
+    """
+
+    def __init__(self, x, y, width, height, **kwargs):
+        super().__init__([MplPath.unit_rectangle()] * len(x), **kwargs)
+        self._cell_transforms = np.zeros((len(x), 3, 3))
+        self._cell_transforms[:, 0, 0] = width
+        self._cell_transforms[:, 1, 1] = height
+        self._cell_transforms[:, 0, 2] = x
+        self._cell_transforms[:, 1, 2] = y
+        self._cell_transforms[:, 2, 2] = 1
+
+    def get_transforms(self):
+        return self._cell_transforms
+
+class _RepeatedText(Text):
+    """
+    同一文字（字体、颜色相同）在多个位置重复绘制：
+    只创建一个Text对象，绘制时逐个移动位置，代替逐格创建的Text
+    """
+
+    def __init__(self, positions, text, **kwargs):
+        super().__init__(0, 0, text, **kwargs)
+        self._positions = positions
+
+    def draw(self, renderer):
+        for position in self._positions:
+            self.set_position(position)
+            super().draw(renderer)
+
+    def get_window_extent(self, renderer=None, dpi=None):
+        extents = []
+        for position in self._positions:
+            self.set_position(position)
+            extents.append(super().get_window_extent(renderer, dpi))
+        return Bbox.union(extents) if extents else super().get_window_extent(renderer, dpi)
+
+class _IconLayer(Artist):
+    """
+    Auto Level图标图层：所有行的图标由一个Artist绘制，
+    按渲染DPI从图标集中取预缩放位图直接贴入，不再为每行创建OffsetImage并重采样
+    """
+
+    def __init__(self, atlas, placements, size_points):
+        super().__init__()
+        self._atlas = atlas
+        self._levels = [level for level, _, _ in placements]
+        self._centers = np.array([(x, y) for _, x, y in placements], dtype=float)
+        self._size_points = size_points
+        self.set_zorder(3)
+
+    @allow_rasterization
+    def draw(self, renderer):
+        if not self.get_visible() or not len(self._levels):
+            return
+        size_px = max(1, round(self._size_points * renderer.points_to_pixels(1.)))
+        centers = self.get_transform().transform(self._centers)
+        gc = renderer.new_gc()
+        self._set_gc_clip(gc)
+        for level, (cx, cy) in zip(self._levels, centers):
+            image = self._atlas.scaled(level, size_px)
+            if image is not None:
+                height, width = image.shape[:2]
+                renderer.draw_image(gc, round(cx - width / 2), round(cy - height / 2), image)
+        gc.restore()
+        self.stale = False
+
+def downsample_image(image, scale=None, width=None):
+    """
+    高质量缩小图片：先按整数倍做区域平均，再用Lanczos处理剩余比例
+    
+    Args:
+        scale: 缩放比例（如 150/300）
+        width: 目标宽度（像素，按比例计算高度）；与 scale 二选一
+    """
+    if width is not None:
+        scale = width / image.width
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    return image.resize(size, Image.LANCZOS, reducing_gap=1.0)
+
+def encode_png(image, dpi=None):
+    """把PIL图片编码为PNG字节（可写入DPI元数据）"""
+    buffer = io.BytesIO()
+    if dpi:
+        image.save(buffer, format='png', dpi=(dpi, dpi))
+    else:
+        image.save(buffer, format='png')
+    return buffer.getvalue()
+
+def downsample_png(png_bytes, scale=None, width=None, dpi=None):
+    """把已有的PNG缩小为低分辨率版本（例如由缓存中的高DPI图片派生）"""
+    image = Image.open(io.BytesIO(png_bytes))
+    if image.mode == 'RGBA' and image.getextrema()[3][0] == 255:
+        image = image.convert('RGB')
+    return encode_png(downsample_image(image, scale, width), dpi)
+
+def derived_path(save_path, label):
+    """派生图片的文件名：complete.png -> complete_150dpi.png / complete_thumb.png"""
+    path = Path(save_path)
+    return str(path.with_name(f"{path.stem}_{label}{path.suffix}"))
+
+# 渲染进程内的生成器（由进程池initializer用已解析的数据创建，每个进程只创建一次）
+_worker_generator = None
+
+def _init_render_worker(csv_file, dataset):
+    global _worker_generator
+    _worker_generator = Complete41PapersTableGenerator(csv_file, dataset=dataset)
+
+def _render_page_worker(rows, image_width, image_height, dpi, format, derived_dpis, thumbnail_width):
+    return _worker_generator.render_page(rows, image_width, image_height, dpi, format,
+                                         derived_dpis, thumbnail_width)
+
+def _render_variant_worker(image_type, save_path, derived_dpis, thumbnail_width):
+    return _worker_generator.render_variant(image_type, save_path, derived_dpis, thumbnail_width)
+
 class Complete41PapersTableGenerator:
-    def __init__(self, csv_file_path):
+    def __init__(self, csv_file_path, use_cache=True, dataset=None):
         """
         完整41篇论文表格图片生成器
         
         Args:
             csv_file_path: CSV文件路径
+            use_cache: 是否使用磁盘缓存的解析结果
+            dataset: 已解析的 (PaperStore, PaperCitationManager)，提供时不再读取CSV
         """
         self.csv_file = csv_file_path
+        self.cache = default_cache if use_cache else None
         self.data = []
-        self.load_csv_data()
-        
-        # 初始化BibTeX风格的引用管理器
-        self.citation_manager = PaperCitationManager(self.data)
+        # 加载数据，同时初始化BibTeX风格的引用管理器
+        if dataset is not None:
+            self.store, self.citation_manager = dataset
+            self.data = self.store.records
+        else:
+            self.load_csv_data()
         
         # 加载图标
         self.load_icons()
         
+        # 数据单元格背景合并为一个集合绘制（False时逐个添加Rectangle）
+        self.batch_cells = True
+        
         # 优化的颜色方案 - 基于新配色方案
         self.colors = {
             'header_basic': '#203F9A',      # Bright Blue - 基础表头
@@ -58,11 +239,6 @@ class Complete41PapersTableGenerator:
             'domain_education': '#BED4B1'        # Eggshell - Education and Service Industries
         }
         
-        # 设置字体
-        plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'DejaVu Sans']
-        plt.rcParams['axes.unicode_minus'] = False
-        plt.rcParams['font.size'] = 8
-        
     def load_icons(self):
         """加载Auto Level对应的图标"""
         icon_path = Path("icon")
@@ -75,69 +251,43 @@ class Complete41PapersTableGenerator:
             'assist': 'Wrench.png'
         }
         
-        for level, icon_file in icon_mapping.items():
-            icon_file_path = icon_path / icon_file
-            if icon_file_path.exists():
-                # 读取图标
-                img = plt.imread(str(icon_file_path))
-                self.icons[level] = img
-            else:
-                print(f"⚠️ 警告: 找不到图标文件 {icon_file_path}")
-                self.icons[level] = None
+        def read_icons():
+            icons = {}
+            for level, icon_file in icon_mapping.items():
+                icon_file_path = icon_path / icon_file
+                if icon_file_path.exists():
+                    # 读取图标
+                    icons[level] = mpimg.imread(str(icon_file_path))
+                else:
+                    print(f"⚠️ 警告: 找不到图标文件 {icon_file_path}")
+                    icons[level] = None
+            return icons
+        
+        icon_files = [icon_path / f for f in icon_mapping.values() if (icon_path / f).exists()]
+        if self.cache is None:
+            self.icons = read_icons()
+        else:
+            self.icons = self.cache.load('icons', icon_files, read_icons)
+        
+        # 预缩放图标集（同一进程内按像素尺寸共享缩放结果）
+        self.icon_atlas = IconAtlas(self.icons)
+
     def load_csv_data(self):
-        """加载完整CSV数据"""
+        """加载完整CSV数据（共享列式存储）"""
         try:
-            with open(self.csv_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            # 解析所有有效数据行（从第3行开始）
-            for i, line in enumerate(lines[2:], start=3):
-                row = [cell.strip() for cell in line.split(',')]
-                if len(row) > 5 and row[0] and row[0].strip():  # 确保有有效的编号
-                    paper_data = {
-                        'no': row[0].strip(),
-                        'title': row[1].strip() if len(row) > 1 else '',
-                        'venue': row[2].strip() if len(row) > 2 else '',
-                        'year': row[3].strip() if len(row) > 3 else '',
-                        'author': row[4].strip() if len(row) > 4 else '',
-                        'analogy_process': [
-                            row[5].strip() if len(row) > 5 else '', 
-                            row[6].strip() if len(row) > 6 else '', 
-                            row[7].strip() if len(row) > 7 else '', 
-                            row[8].strip() if len(row) > 8 else ''
-                        ],
-                        'create_process': [
-                            row[9].strip() if len(row) > 9 else '', 
-                            row[10].strip() if len(row) > 10 else '', 
-                            row[11].strip() if len(row) > 11 else '', 
-                            row[12].strip() if len(row) > 12 else '', 
-                            row[13].strip() if len(row) > 13 else '', 
-                            row[14].strip() if len(row) > 14 else '', 
-                            row[15].strip() if len(row) > 15 else ''
-                        ],
-                        'representation': [
-                            row[16].strip() if len(row) > 16 else '', 
-                            row[17].strip() if len(row) > 17 else '', 
-                            row[18].strip() if len(row) > 18 else '', 
-                            row[19].strip() if len(row) > 19 else '', 
-                            row[20].strip() if len(row) > 20 else '', 
-                            row[21].strip() if len(row) > 21 else ''
-                        ],
-                        'automation': row[22].strip() if len(row) > 22 else '',
-                        'application': row[23].strip() if len(row) > 23 else '',
-                        'specific_domain': row[23].strip() if len(row) > 23 else '',
-                        'domain_category': row[24].strip() if len(row) > 24 else ''  # 大分类
-                    }
-                    self.data.append(paper_data)
-            
+            self.store, self.citation_manager = load_dataset(self.csv_file, self.cache)
+            self.data = self.store.records
             print(f"✅ 成功加载 {len(self.data)} 篇论文的完整数据")
             
         except Exception as e:
+            self.store = PaperStore.from_rows([], [], source=self.csv_file)
+            self.citation_manager = PaperCitationManager([])
+            self.data = self.store.records
             print(f"❌ 加载数据失败: {e}")
 
     def translate_domain(self, domain):
         """翻译domain为英文"""
-        if not domain or pd.isna(domain):
+        if not domain:
             return ''
         domain_str = str(domain).strip()
         return DOMAIN_ZH2EN.get(domain_str, domain_str)
@@ -153,29 +303,241 @@ class Complete41PapersTableGenerator:
             image_height: 图片高度（英寸）
             dpi: 分辨率
         """
+        fig = self._build_table_figure(image_width, image_height, dpi)
+        
+        # 保存高质量图片
+        self._save_figure(fig, save_path, dpi)
+        print(f"📸 完整41篇论文表格图片已保存: {save_path}")
+        
+        return fig
+
+    def _build_table_figure(self, image_width, image_height, dpi, rows=None):
+        """
+        构建表格图形
+        不经过 pyplot：图形不注册到全局图形管理器，也不修改全局 rcParams，
+        因此多个线程可以同时渲染不同的表格
+        
+        Args:
+            rows: 本页要绘制的行下标（已排序）；None表示全部论文
+        """
         # 创建紧凑图形以减少留白
-        fig, ax = plt.subplots(figsize=(image_width, image_height), dpi=dpi)
-        ax.set_xlim(0, 84)  # 扩大坐标范围以容纳所有列
-        ax.set_ylim(0, 80)  # 缩小坐标范围
+        fig = Figure(figsize=(image_width, image_height), dpi=dpi)
+        FigureCanvasAgg(fig)
+        # 所有内容都在坐标区内，坐标区位置可直接算出，不需要 tight_layout 额外绘制一遍
+        margin_x, margin_y = FIGURE_MARGIN / image_width, FIGURE_MARGIN / image_height
+        ax = fig.add_axes((margin_x, margin_y, 1 - 2 * margin_x, 1 - 2 * margin_y))
+        ax.set_xlim(0, X_RANGE)  # 扩大坐标范围以容纳所有列
+        ax.set_ylim(0, Y_RANGE)  # 缩小坐标范围
         ax.axis('off')
         
         # 绘制表格
         self._draw_complete_table_headers(ax)
-        self._draw_complete_table_data(ax)
+        self._draw_complete_table_data(ax, rows)
         
         # 在表格下方绘制图例
-        self._draw_bottom_legend(ax)
+        self._draw_bottom_legend(ax, len(self.data) if rows is None else len(rows))
         
-        # 保存高质量图片
-        plt.tight_layout()
-        plt.savefig(save_path, dpi=dpi, bbox_inches='tight', 
-                   facecolor='white', edgecolor='none', 
-                   pad_inches=0.2)
-        print(f"📸 完整41篇论文表格图片已保存: {save_path}")
+        # 字体只作用于本图形的文本
+        for text in fig.findobj(Text):
+            text.set_fontfamily(_font_family())
         
-        plt.close()
         return fig
 
+    def _save_figure(self, fig, save_path, dpi, **kwargs):
+        """
+        按统一参数保存图形（save_path 可以是文件路径或可写的二进制流）
+        文字在绘制前已按实际宽度排好，不会超出坐标区，
+        因此直接按坐标区裁剪，省去 bbox_inches='tight' 的测量绘制
+        """
+        width, height = fig.get_size_inches()
+        bbox = Bbox.from_extents(FIGURE_MARGIN, FIGURE_MARGIN,
+                                 width - FIGURE_MARGIN, height - FIGURE_MARGIN).padded(SAVE_PADDING)
+        fig.savefig(save_path, dpi=dpi, bbox_inches=bbox, 
+                    facecolor='white', edgecolor='none', **kwargs)
+
+    def render_image(self, output=None, image_width=16, image_height=22, dpi=300,
+                     format='png', rows=None):
+        """
+        渲染表格到内存或调用方提供的可写二进制流（不写任何文件）
+        
+        Args:
+            output: 可写的二进制流；None 时渲染到内存缓冲区
+            format: 图片格式（png/pdf/svg）
+            rows: 要绘制的行下标；None表示全部论文
+        
+        Returns:
+            bytes: output 为 None 时返回图片字节，否则返回 None
+        """
+        fig = self._build_table_figure(image_width, image_height, dpi, rows)
+        buffer = io.BytesIO() if output is None else output
+        self._save_figure(fig, buffer, dpi, format=format)
+        return buffer.getvalue() if output is None else None
+
+    def render_page(self, rows, image_width, image_height, dpi, format='png',
+                    derived_dpis=(), thumbnail_width=None):
+        """
+        渲染一页（带表头和图例），返回 {输出: 字节}，主输出的键为 dpi
+        PNG页可同时输出更低DPI的版本和缩略图（键同 render_resolutions），由同一次渲染缩小得到
+        """
+        extra_dpis = [d for d in derived_dpis if d < dpi]
+        if format == 'png' and (extra_dpis or thumbnail_width):
+            return self.render_resolutions(image_width, image_height, [dpi] + extra_dpis,
+                                           thumbnail_width, rows)
+        return {dpi: self.render_image(None, image_width, image_height, dpi, format, rows)}
+
+    def render_resolutions(self, image_width, image_height, dpis, thumbnail_width=None, rows=None):
+        """
+        单次渲染输出多种分辨率的PNG
+        只在最高DPI下布局和光栅化一次，其余DPI和缩略图都由像素缓冲区缩小得到
+        
+        Args:
+            dpis: 需要的DPI列表
+            thumbnail_width: 缩略图宽度（像素）；None表示不生成
+        
+        Returns:
+            dict: {dpi: PNG字节}，生成缩略图时另有 'thumbnail' 键
+        """
+        top_dpi = max(dpis)
+        fig = self._build_table_figure(image_width, image_height, top_dpi, rows)
+        buffer = io.BytesIO()
+        self._save_figure(fig, buffer, top_dpi, format='png')
+        outputs = {top_dpi: buffer.getvalue()}
+        
+        # 直接取Agg画布上刚光栅化的像素，免去PNG解码；背景不透明时去掉alpha通道加快缩放和编码
+        pixels = np.asarray(fig.canvas.renderer.buffer_rgba())
+        source = Image.fromarray(pixels[..., :3] if pixels[..., 3].min() == 255 else pixels)
+        smallest = source
+        for dpi in sorted(set(dpis) - {top_dpi}, reverse=True):
+            smallest = downsample_image(source, scale=dpi / top_dpi)
+            outputs[dpi] = encode_png(smallest, dpi)
+        if thumbnail_width:
+            # 从最小的派生图再缩小，缩略图几乎不增加耗时
+            outputs['thumbnail'] = encode_png(downsample_image(smallest, width=thumbnail_width))
+        return outputs
+
+    def render_variant(self, image_type, save_path, derived_dpis=(), thumbnail_width=None):
+        """
+        按预设渲染一个图片变体（格式由文件扩展名决定），返回耗时（秒）
+        PNG变体可同时输出更低DPI的版本和缩略图（见 derived_path），它们由同一次渲染缩小得到
+        """
+        image_width, image_height, dpi = IMAGE_PRESETS[image_type]
+        start = time.perf_counter()
+        extra_dpis = [d for d in derived_dpis if d < dpi]
+        if Path(save_path).suffix.lower() == '.png' and (extra_dpis or thumbnail_width):
+            outputs = self.render_resolutions(image_width, image_height, [dpi] + extra_dpis,
+                                              thumbnail_width)
+            for key, data in outputs.items():
+                if key == dpi:
+                    path = save_path
+                else:
+                    path = derived_path(save_path, 'thumb' if key == 'thumbnail' else f"{key}dpi")
+                Path(path).write_bytes(data)
+        else:
+            fig = self._build_table_figure(image_width, image_height, dpi)
+            self._save_figure(fig, save_path, dpi)
+        return time.perf_counter() - start
+
+    def create_variants(self, variants=DEFAULT_VARIANTS,
+                        name_template="complete_41_papers_{type}.{format}", max_workers=None,
+                        derived_dpis=(), thumbnail_width=None):
+        """
+        用同一份已解析的数据并行渲染多个图片变体
+        
+        Args:
+            variants: [(图片类型, 格式)]，类型见 IMAGE_PRESETS，格式见 VARIANT_FORMATS
+            name_template: 输出文件名模板，可用 {type} 和 {format}
+            max_workers: 进程数，默认为CPU核数
+            derived_dpis: PNG变体额外输出的低DPI版本
+            thumbnail_width: PNG变体额外输出的缩略图宽度（像素）
+        
+        Returns:
+            list: [(文件路径, 耗时秒数)]，与 variants 顺序一致
+        """
+        paths = [name_template.format(type=image_type, format=fmt) for image_type, fmt in variants]
+        if not paths:
+            return []
+        
+        workers = min(len(paths), max_workers or os.cpu_count() or 1)
+        if workers == 1:
+            timings = [self.render_variant(image_type, path, derived_dpis, thumbnail_width)
+                       for (image_type, _), path in zip(variants, paths)]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker,
+                                     initargs=(self.csv_file, (self.store, self.citation_manager))) as pool:
+                timings = list(pool.map(_render_variant_worker,
+                                        [image_type for image_type, _ in variants], paths,
+                                        [tuple(derived_dpis)] * len(paths),
+                                        [thumbnail_width] * len(paths)))
+        return list(zip(paths, timings))
+
+    def paginate(self, rows_per_page=ROWS_PER_PAGE):
+        """按年份排序后把论文切分成若干页，返回每页的行下标"""
+        order = self.store.order_by_year()
+        return [order[start:start + rows_per_page] for start in range(0, len(order), rows_per_page)]
+
+    def create_paginated_images(self, save_path="complete_papers_table.png", image_width=16,
+                                image_height=22, dpi=300, rows_per_page=ROWS_PER_PAGE, max_workers=None,
+                                derived_dpis=(), thumbnail_width=None):
+        """
+        分页渲染：每页重复表头和图例，格式由文件扩展名决定
+        
+        Args:
+            save_path: .pdf 输出一个多页矢量PDF；.png / .svg 输出编号的页面序列
+                       （name_p001.png ...，PNG和SVG各页在进程池中并行渲染）
+            rows_per_page: 每页行数（默认布局最多容纳41行）
+            max_workers: 进程数，默认为CPU核数
+            derived_dpis: PNG页额外输出的低DPI版本（见 derived_path，如 name_p001_150dpi.png）
+            thumbnail_width: PNG页额外输出的缩略图宽度（像素）
+        
+        Returns:
+            list: 生成的文件路径（不含派生的低DPI版本和缩略图）
+        """
+        save_path = Path(save_path)
+        fmt = save_path.suffix.lower().lstrip('.') or 'png'
+        if fmt not in VARIANT_FORMATS:
+            raise ValueError(f"不支持的分页输出格式: {save_path.suffix} (可选: {'/'.join(VARIANT_FORMATS)})")
+        
+        pages = self.paginate(rows_per_page)
+        if not pages:
+            print("❌ 没有可渲染的数据")
+            return []
+        
+        if fmt == 'pdf':
+            # 多页PDF：各页图形依次写入同一个文件
+            with PdfPages(save_path) as pdf:
+                for rows in pages:
+                    fig = self._build_table_figure(image_width, image_height, dpi, rows)
+                    self._save_figure(fig, pdf, dpi, format='pdf')
+            outputs = [save_path]
+        else:
+            workers = min(len(pages), max_workers or os.cpu_count() or 1)
+            if workers == 1:
+                rendered = [self.render_page(rows, image_width, image_height, dpi, fmt,
+                                             derived_dpis, thumbnail_width) for rows in pages]
+            else:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker,
+                                         initargs=(self.csv_file, (self.store, self.citation_manager))) as pool:
+                    count = len(pages)
+                    rendered = list(pool.map(_render_page_worker, pages,
+                                             [image_width] * count, [image_height] * count, [dpi] * count,
+                                             [fmt] * count, [tuple(derived_dpis)] * count,
+                                             [thumbnail_width] * count))
+            
+            outputs = []
+            for page_no, page_outputs in enumerate(rendered, start=1):
+                page_path = save_path.with_name(f"{save_path.stem}_p{page_no:03d}.{fmt}")
+                for key, data in page_outputs.items():
+                    if key == dpi:
+                        path = page_path
+                    else:
+                        path = derived_path(page_path, 'thumb' if key == 'thumbnail' else f"{key}dpi")
+                    Path(path).write_bytes(data)
+                outputs.append(page_path)
+        
+        print(f"📸 分页表格已保存: {len(pages)}页, {len(self.data)}篇论文 -> "
+              f"{outputs[0] if len(outputs) == 1 else f'{outputs[0]} ... {outputs[-1]}'}")
+        return outputs
+
     def _draw_title(self, ax):
         """绘制表格标题"""
         ax.text(50, 97, 'Analogy-based Design Research Analysis (Complete Dataset: 41 Papers)', 
@@ -272,23 +634,30 @@ class Complete41PapersTableGenerator:
                ha='center', va='center', fontsize=16, fontweight='bold', 
                color='white')
 
-    def _wrap_text(self, text, max_width, fontsize=10, word_based=False):
-        """文本自动换行功能"""
-        import textwrap
-        
-        # 更准确的字符宽度估算
-        # 对于8号字体，每个字符大约占0.15个单位宽度
-        char_width = fontsize * 0.04
-        
-        # 计算每行能容纳的字符数
-        chars_per_line = max(1, int(max_width / char_width))
-        
-        # 使用textwrap进行换行
-        wrapped_lines = textwrap.wrap(text, width=chars_per_line)
-        return wrapped_lines
+    def _text_metrics(self, ax):
+        """文本测量器和每个数据单位对应的磅数 (横向, 纵向)"""
+        fig = ax.figure
+        width, height = fig.get_size_inches()
+        position = ax.get_position()
+        points_per_unit = (position.width * width * 72 / X_RANGE,
+                           position.height * height * 72 / Y_RANGE)
+        return TextMeasurer(_font_family(), fig.dpi), points_per_unit
+
+    def _fit_text(self, ax, text, max_width, fontsize=10, fontweight='normal'):
+        """按实际字体宽度截断单行文本（max_width为单元格宽度，数据单位）"""
+        measurer, (points_per_unit, _) = self._text_metrics(ax)
+        available = (max_width - 2 * CELL_TEXT_PADDING) * points_per_unit
+        return measurer.truncate(text, available, fontsize, fontweight)
 
-    def _draw_complete_table_data(self, ax):
-        """绘制所有41篇论文的数据"""
+    def _wrap_text(self, ax, text, max_width, max_height, fontsize=10, fontweight='normal'):
+        """按实际字体宽度自动换行，行数超出单元格高度时截断最后一行"""
+        measurer, (points_per_unit_x, points_per_unit_y) = self._text_metrics(ax)
+        available = (max_width - 2 * CELL_TEXT_PADDING) * points_per_unit_x
+        max_lines = max(1, int(max_height * points_per_unit_y / (fontsize * MIN_LINE_SPACING)))
+        return measurer.wrap(text, available, fontsize, max_lines, fontweight)
+
+    def _draw_complete_table_data(self, ax, rows=None):
+        """绘制论文数据（rows为本页行下标，默认全部论文按年份排序）"""
         # 数据行设置 - 优化为紧凑布局
         row_height = 1.6  # 减小行高以容纳更多数据
         start_y = 75 - 5  # 表头下方（紧凑布局）
@@ -302,26 +671,34 @@ class Complete41PapersTableGenerator:
             current_x += width
         
         # 按年份排序数据
-        sorted_data = sorted(self.data, key=lambda x: int(x['year']) if x['year'].isdigit() else 9999)
+        order = self.store.order_by_year() if rows is None else rows
+        
+        # 单元格背景和边框先收集起来，最后作为一个集合整体绘制；
+        # ✓/×符号按样式分组，每组只用一个Text对象；图标由一个共享图层贴图
+        cells = [] if self.batch_cells else None
+        symbols = {} if self.batch_cells else None
+        icons = [] if self.batch_cells else None
         
-        for i, paper in enumerate(sorted_data):
+        for i, paper_idx in enumerate(order):
+            paper = self.data[paper_idx]
+            flags = self.store.flags[paper_idx]
             row_y = start_y - (i * row_height)
             
             # 获取BibTeX风格的引用序号
-            citation_number = self.citation_manager.get_paper_citation_number(paper['no'])
+            citation_number = self.citation_manager.get_paper_citation_number(paper.no)
             citation_text = f"[{citation_number}]" if citation_number > 0 else str(i + 1)
             
             # 基本信息列 - 清空Cite列内容
             self._draw_data_cell(ax, col_positions[0], row_y, col_widths[0], row_height, 
-                               '', self.colors['basic_info'])
+                               '', self.colors['basic_info'], batch=cells)
             
-            # 处理标题长度 - 不超过25则不省略
-            title_display = paper['title'][:30] + '...' if len(paper['title']) > 25 else paper['title']
+            # 处理标题长度 - 按实际宽度截断，放不下时加省略号
+            title_display = self._fit_text(ax, paper.title, col_widths[1], fontsize=12)
             self._draw_data_cell(ax, col_positions[1], row_y, col_widths[1], row_height, 
-                               title_display, self.colors['basic_info'], align='left')
+                               title_display, self.colors['basic_info'], align='left', batch=cells)
             
             # 处理venue缩写 - 超过10个字符则缩写
-            venue = paper['venue']
+            venue = paper.venue
             if len(venue) > 10:
                 # 按空格分割，取每个单词首字母大写
                 words = venue.split()
@@ -329,66 +706,50 @@ class Complete41PapersTableGenerator:
             else:
                 venue_abbr = venue
             self._draw_data_cell(ax, col_positions[2], row_y, col_widths[2], row_height, 
-                               venue_abbr, self.colors['venue'])
+                               venue_abbr, self.colors['venue'], batch=cells)
             self._draw_data_cell(ax, col_positions[3], row_y, col_widths[3], row_height, 
-                               paper['year'], self.colors['year'])
+                               paper.year, self.colors['year'], batch=cells)
             
             
-            # 过程数据列
+            # 过程数据列 - 类比过程蓝色、创作过程粉色、表示方式浅蓝
             col_idx = 4
-            
-            # Analogy Process - 使用蓝色
-            for value in paper['analogy_process']:
-                # 只有空字符视为不支持，其他所有字符都视为支持
-                if value.strip() == '':
-                    color = self.colors['not_supported']
-                    symbol = '×'
-                else:
-                    color = self.colors['analogy_supported']
-                    symbol = '✓'
-                self._draw_data_cell(ax, col_positions[col_idx], row_y, col_widths[col_idx], 
-                                   row_height, symbol, color)
-                col_idx += 1
-
-            # Create Process - 使用粉色
-            for value in paper['create_process']:
-                if value.strip() == '':
-                    color = self.colors['not_supported']
-                    symbol = '×'
-                else:
-                    color = self.colors['create_supported']
-                    symbol = '✓'
-                self._draw_data_cell(ax, col_positions[col_idx], row_y, col_widths[col_idx], 
-                                   row_height, symbol, color)
-                col_idx += 1
-
-            # Representation - 使用橙色
-            for value in paper['representation']:
-                if value.strip() == '':
-                    color = self.colors['not_supported']
-                    symbol = '×'
-                else:
-                    color = self.colors['representation_supported']
-                    symbol = '✓'
-                self._draw_data_cell(ax, col_positions[col_idx], row_y, col_widths[col_idx], 
-                                   row_height, symbol, color)
-                col_idx += 1
+            for group_slice, supported_color in (
+                    (ANALOGY_SLICE, self.colors['analogy_supported']),
+                    (CREATE_SLICE, self.colors['create_supported']),
+                    (REPR_SLICE, self.colors['representation_supported'])):
+                for supported in flags[group_slice]:
+                    # 只有空字符视为不支持，其他所有字符都视为支持
+                    if supported:
+                        color = supported_color
+                        symbol = '✓'
+                    else:
+                        color = self.colors['not_supported']
+                        symbol = '×'
+                    if symbols is not None:
+                        x, width = col_positions[col_idx], col_widths[col_idx]
+                        self._add_cell_background(ax, x, row_y, width, row_height, color, cells)
+                        style = (symbol,) + self._cell_text_style(color)
+                        symbols.setdefault(style, []).append((x + width/2, row_y + row_height/2))
+                    else:
+                        self._draw_data_cell(ax, col_positions[col_idx], row_y, col_widths[col_idx], 
+                                           row_height, symbol, color)
+                    col_idx += 1
             # Auto Level 和 Domain - 使用图标
-            automation_level = paper['automation'].strip().lower()
+            automation_level = paper.automation.lower()
             if automation_level in self.icons and self.icons[automation_level] is not None:
                 # 绘制图标
                 self._draw_icon_cell(ax, col_positions[21], row_y, col_widths[21], row_height, 
-                                   self.icons[automation_level])
+                                   automation_level, batch=cells, icon_batch=icons)
             else:
                 # 如果图标不存在，使用文字
                 self._draw_data_cell(ax, col_positions[21], row_y, col_widths[21], row_height, 
-                                   paper['automation'], self.colors['auto'])
+                                   paper.automation, self.colors['auto'], batch=cells)
             
             # 翻译specific domain为英文 - 使用小字体和自动换行，并根据大分类设置背景颜色
-            specific_domain_en = self.translate_domain(paper['specific_domain'])
+            specific_domain_en = self.translate_domain(paper.specific_domain)
             
             # 根据大分类确定背景颜色 - 统一调整为80%透明度
-            domain_category = paper.get('domain_category', '').strip()
+            domain_category = paper.domain_category
             if 'Creative Industries' in domain_category:
                 bg_color = self.colors['domain_creative']
             elif 'Intelligent Manufacturing' in domain_category:
@@ -402,27 +763,58 @@ class Complete41PapersTableGenerator:
             bg_color_with_alpha = bg_color + '80'  # 添加50%透明度 (80 = 128/255 ≈ 50%)
             
             self._draw_data_cell(ax, col_positions[22], row_y, col_widths[22], row_height, 
-                               specific_domain_en, bg_color_with_alpha, align='left', fontsize=11, wrap_text=True)
+                               specific_domain_en, bg_color_with_alpha, align='left', fontsize=11, wrap_text=True,
+                               batch=cells)
+        
+        if cells:
+            self._add_cell_collection(ax, cells, linewidth=0.3)
+        for (symbol, text_color, fontweight), positions in (symbols or {}).items():
+            ax.add_artist(_RepeatedText(positions, symbol, ha='center', va='center', fontsize=12,
+                                        fontweight=fontweight, color=text_color, clip_on=False))
+        if icons:
+            ax.add_artist(_IconLayer(self.icon_atlas, icons, ICON_SIZE_POINTS))
+
+    def _add_cell_background(self, ax, x, y, width, height, color, batch=None):
+        """绘制单元格背景；提供batch时只记录，稍后统一绘制"""
+        if batch is not None:
+            batch.append((x, y, width, height, color))
+        else:
+            rect = Rectangle((x, y), width, height, 
+                            facecolor=color, edgecolor=self.colors['border'], 
+                            linewidth=0.3)
+            ax.add_patch(rect)
+
+    def _add_cell_collection(self, ax, cells, linewidth):
+        """把收集到的单元格作为一个集合绘制（顺序与逐个添加时一致）"""
+        x, y, width, height = np.array([c[:4] for c in cells], dtype=float).T
+        collection = _CellCollection(x, y, width, height, 
+                                     facecolors=[c[4] for c in cells],
+                                     edgecolors=self.colors['border'], linewidths=linewidth,
+                                     joinstyle='miter', capstyle='butt')
+        ax.add_collection(collection, autolim=False)
+
+    def _cell_text_style(self, color):
+        """根据单元格背景色确定文字颜色和粗细"""
+        text_color = self.colors['text_supported'] if color == self.colors['supported'] else (
+                    self.colors['text_not_supported'] if color == self.colors['not_supported'] else 'black')
+        fontweight = 'bold' if color == self.colors['supported'] else 'normal'
+        return text_color, fontweight
 
-    def _draw_data_cell(self, ax, x, y, width, height, text, color, align='center', fontsize=12, wrap_text=False):
+    def _draw_data_cell(self, ax, x, y, width, height, text, color, align='center', fontsize=12, wrap_text=False,
+                        batch=None):
         """绘制数据单元格"""
         # 绘制背景
-        rect = Rectangle((x, y), width, height, 
-                        facecolor=color, edgecolor=self.colors['border'], 
-                        linewidth=0.3)
-        ax.add_patch(rect)
+        self._add_cell_background(ax, x, y, width, height, color, batch)
         
         # 添加文字
-        text_color = self.colors['text_supported'] if color == self.colors['supported'] else (
-                    self.colors['text_not_supported'] if color == self.colors['not_supported'] else 'black')
-        fontweight = 'bold' if color == self.colors['supported'] else 'normal'
+        text_color, fontweight = self._cell_text_style(color)
         
         ha = 'left' if align == 'left' else 'center'
-        text_x = x + 0.3 if align == 'left' else x + width/2
+        text_x = x + CELL_TEXT_PADDING if align == 'left' else x + width/2
         
-        if wrap_text and len(str(text)) > 10:  # 降低换行阈值
+        if wrap_text:
             # 换行处理
-            wrapped_lines = self._wrap_text(str(text), width, fontsize)
+            wrapped_lines = self._wrap_text(ax, str(text), width, height, fontsize, fontweight)
             
             # 改进的行间距计算 - 向下自左向右换行
             if len(wrapped_lines) > 1:
@@ -433,9 +825,9 @@ class Complete41PapersTableGenerator:
                     ax.text(text_x, line_y, line, 
                            ha=ha, va='center', fontsize=fontsize, fontweight=fontweight, 
                            color=text_color)
-            else:
+            elif wrapped_lines:
                 # 单行文本
-                ax.text(text_x, y + height/2, str(text), 
+                ax.text(text_x, y + height/2, wrapped_lines[0], 
                        ha=ha, va='center', fontsize=fontsize, fontweight=fontweight, 
                        color=text_color)
         else:
@@ -444,20 +836,23 @@ class Complete41PapersTableGenerator:
                    ha=ha, va='center', fontsize=fontsize, fontweight=fontweight, 
                    color=text_color)
 
-    def _draw_icon_cell(self, ax, x, y, width, height, icon_img):
+    def _draw_icon_cell(self, ax, x, y, width, height, level, batch=None, icon_batch=None):
         """绘制包含图标的单元格"""
         # 绘制背景
-        rect = Rectangle((x, y), width, height, 
-                        facecolor=self.colors['auto'], edgecolor=self.colors['border'], 
-                        linewidth=0.3)
-        ax.add_patch(rect)
+        self._add_cell_background(ax, x, y, width, height, self.colors['auto'], batch)
         
         # 计算图标位置和大小 - 固定90x90像素
         icon_x = x + width/2
         icon_y = y + height/2
         
+        if icon_batch is not None:
+            # 交给共享图标图层，按当前DPI贴入预缩放的位图
+            icon_batch.append((level, icon_x, icon_y))
+            return
+        
         # 计算缩放比例 - 目标像素大小（增加10%）
-        target_size = 20  # 目标像素大小（从15增加到16.5，增加10%）
+        icon_img = self.icons[level]
+        target_size = ICON_SIZE_POINTS  # 目标像素大小（从15增加到16.5，增加10%）
         # 获取图片的原始尺寸
         img_height, img_width = icon_img.shape[:2]
         # 计算缩放比例，取较小的缩放比例确保图片完整显示
@@ -469,10 +864,12 @@ class Complete41PapersTableGenerator:
                            frameon=False, box_alignment=(0.5, 0.5))
         ax.add_artist(ab)
 
-    def _draw_bottom_legend(self, ax):
+    def _draw_bottom_legend(self, ax, row_count=None):
         """在表格下方绘制图例"""
+        if row_count is None:
+            row_count = len(self.data)
         # 图例位置 - 在表格数据下方，紧凑布局
-        legend_start_y = 75 - 5 - (len(self.data) * 1.5) - 1.7  # 紧凑布局
+        legend_start_y = 75 - 5 - (row_count * 1.5) - 1.7  # 紧凑布局
         
         # 新的图例内容 - 5列布局，单行格式，删除icon
         legend_items = [
@@ -622,20 +1019,22 @@ class Complete41PapersTableGenerator:
 
     def create_publication_ready_image(self, save_path="analogy_design_publication_ready.png"):
         """创建发表级质量的图片"""
+        image_width, image_height, dpi = IMAGE_PRESETS['publication']
         return self.create_complete_table_image(
             save_path=save_path,
-            image_width=20,
-            image_height=28, 
-            dpi=300
+            image_width=image_width,
+            image_height=image_height, 
+            dpi=dpi
         )
 
     def create_presentation_image(self, save_path="analogy_design_presentation.png"):
         """创建演示用图片"""
+        image_width, image_height, dpi = IMAGE_PRESETS['presentation']
         return self.create_complete_table_image(
             save_path=save_path,
-            image_width=16,
-            image_height=22,
-            dpi=200
+            image_width=image_width,
+            image_height=image_height,
+            dpi=dpi
         )
 
     def print_data_summary(self):
@@ -647,72 +1046,99 @@ class Complete41PapersTableGenerator:
         print(f"\n📊 数据摘要 (共{len(self.data)}篇论文)")
         print("=" * 50)
         
+        # 所有分布和标志位计数由统计引擎一次算出
+        statistics = PaperStatistics.from_store(self.store)
+        
         # 会议统计
-        venues = {}
-        for paper in self.data:
-            venue = paper['venue'] or 'Unknown'
-            venues[venue] = venues.get(venue, 0) + 1
+        venues = statistics.counts['venues']
         
         print("🏛️ 会议分布:")
         for venue, count in sorted(venues.items(), key=lambda x: x[1], reverse=True)[:5]:
-            print(f"   {venue}: {count}篇")
+            print(f"   {venue or 'Unknown'}: {count}篇")
         
         # 年份统计
-        years = {}
-        for paper in self.data:
-            year = paper['year'] or 'Unknown'
-            years[year] = years.get(year, 0) + 1
+        years = statistics.counts['years']
         
         print("\n📅 年份分布:")
         for year, count in sorted(years.items()):
-            print(f"   {year}: {count}篇")
+            print(f"   {year or 'Unknown'}: {count}篇")
         
         # 自动化级别统计
-        auto_levels = {}
-        for paper in self.data:
-            auto = paper['automation'] or 'Unknown'
-            auto_levels[auto] = auto_levels.get(auto, 0) + 1
+        auto_levels = statistics.counts['auto_levels']
         
         print("\n🤖 自动化级别分布:")
         for level, count in auto_levels.items():
-            print(f"   {level}: {count}篇")
+            print(f"   {level or 'Unknown'}: {count}篇")
+        
+        # 领域大类统计
+        print("\n🏭 领域大类分布:")
+        for category, count in sorted(statistics.counts['domain_categories'].items(),
+                                      key=lambda x: x[1], reverse=True):
+            print(f"   {category or 'Unknown'}: {count}篇")
         
-        # 过程使用情况统计
+        # 过程使用情况统计（标志位矩阵按列求和）
         print("\n📈 特征使用统计:")
-        analogy_usage = [0, 0, 0, 0]
-        create_usage = [0, 0, 0, 0, 0, 0, 0]
-        repr_usage = [0, 0, 0, 0, 0, 0]
-        
-        for paper in self.data:
-            for i, val in enumerate(paper['analogy_process']):
-                if val == '√':
-                    analogy_usage[i] += 1
-            for i, val in enumerate(paper['create_process']):
-                if val == '√':
-                    create_usage[i] += 1
-            for i, val in enumerate(paper['representation']):
-                if val == '√':
-                    repr_usage[i] += 1
-        
-        analogy_labels = ['Enc', 'Ret', 'Map', 'Eva']
-        create_labels = ['Vis', 'Ins', 'Ide', 'Pro', 'Fab', 'Eva', 'Met']
-        repr_labels = ['Txt', 'Vis', 'Str', 'Fun', 'Wor', 'Unc']
-        
-        print("   类比过程:", dict(zip(analogy_labels, analogy_usage)))
-        print("   创作过程:", dict(zip(create_labels, create_usage)))
-        print("   表示方式:", dict(zip(repr_labels, repr_usage)))
+        flag_counts = statistics.flag_counts()
+        
+        print("   类比过程:", flag_counts['analogy_process'])
+        print("   创作过程:", flag_counts['create_process'])
+        print("   表示方式:", flag_counts['representation'])
+        
+        # 共现分析（标志矩阵的矩阵乘法）
+        analytics = FlagAnalytics(self.store)
+        print("\n🔗 创作过程 × 表示方式 最常见组合:")
+        for create, representation, count in analytics.top_pairs('create_process', 'representation'):
+            print(f"   {create} + {representation}: {count}篇")
         
         # 打印BibTeX风格的引用报告
         print(f"\n{self.citation_manager.generate_citation_report()}")
 
 
+def parse_variants(spec):
+    """解析变体参数，如 "publication:png,presentation:svg" """
+    variants = []
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        image_type, _, fmt = item.partition(':')
+        fmt = (fmt or 'png').lower()
+        if image_type not in IMAGE_PRESETS or fmt not in VARIANT_FORMATS:
+            raise ValueError(f"无效的图片变体: {item} "
+                             f"(类型: {'/'.join(IMAGE_PRESETS)}, 格式: {'/'.join(VARIANT_FORMATS)})")
+        variants.append((image_type, fmt))
+    return variants
+
+
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="完整论文表格图片生成器")
+    parser.add_argument('csv_file', nargs='?', default="paper-process-4-vis-2.csv", help="论文CSV文件")
+    parser.add_argument('--variants', default=','.join(f"{t}:{f}" for t, f in DEFAULT_VARIANTS),
+                        help="要生成的图片变体，如 publication:png,presentation:pdf,publication:svg")
+    parser.add_argument('--workers', type=int, default=None, help="并行渲染的进程数（默认CPU核数）")
+    parser.add_argument('--derive-dpis', default='',
+                        help="PNG变体额外输出的低DPI版本（由同一次渲染缩小得到），如 150,72")
+    parser.add_argument('--thumbnail', type=int, nargs='?', const=THUMBNAIL_WIDTH, default=None,
+                        help=f"PNG变体额外输出缩略图，可指定宽度（默认{THUMBNAIL_WIDTH}像素）")
+    args = parser.parse_args()
+    
     print("🎨 完整41篇论文表格图片生成器")
     print("=" * 50)
     
+    try:
+        variants = parse_variants(args.variants)
+        derived_dpis = [int(d) for d in args.derive_dpis.split(',') if d.strip()]
+        if any(d <= 0 for d in derived_dpis) or (args.thumbnail is not None and args.thumbnail <= 0):
+            raise ValueError("--derive-dpis 和 --thumbnail 必须是正整数")
+        if (derived_dpis or args.thumbnail) and not any(fmt == 'png' for _, fmt in variants):
+            raise ValueError("--derive-dpis 和 --thumbnail 只适用于PNG变体，--variants 中没有PNG格式")
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    
     # 使用你的CSV文件
-    csv_file = "paper-process-4-vis-2.csv"
+    csv_file = args.csv_file
     
     # 检查文件是否存在
     if not Path(csv_file).exists():
@@ -733,24 +1159,50 @@ def main():
     
     print(f"\n🎨 正在生成包含{len(generator.data)}篇论文的完整表格图片...")
     
-    # 生成发表级质量图片
-    print("\n📄 生成发表级质量图片 (300 DPI)...")
-    try:
-        generator.create_publication_ready_image("complete_41_papers_publication.png")
-    except Exception as e:
-        print(f"❌ 发表版生成失败: {e}")
+    # 超过单页容量时分页渲染（每页重复表头，多进程并行）；每个变体保持自己的格式
+    if len(generator.data) > ROWS_PER_PAGE:
+        print(f"\n📚 论文数超过单页容量 ({ROWS_PER_PAGE}行)，改为分页输出...")
+        for image_type, fmt in variants:
+            image_width, image_height, dpi = IMAGE_PRESETS[image_type]
+            try:
+                generator.create_paginated_images(f"complete_papers_{image_type}.{fmt}",
+                                                  image_width, image_height, dpi,
+                                                  max_workers=args.workers,
+                                                  derived_dpis=derived_dpis,
+                                                  thumbnail_width=args.thumbnail)
+            except Exception as e:
+                print(f"❌ {image_type}:{fmt} 分页生成失败: {e}")
+                continue
+            if fmt == 'png':
+                for extra_dpi in (d for d in derived_dpis if d < dpi):
+                    print(f"      ↳ 每页另有 PNG {extra_dpi} DPI 版本 (*_{extra_dpi}dpi.png)")
+                if args.thumbnail:
+                    print(f"      ↳ 每页另有缩略图 {args.thumbnail}px (*_thumb.png)")
+        return
     
-    # 生成演示用图片
-    print("\n📺 生成演示用图片 (200 DPI)...")
+    # 各变体在进程池中并行渲染
+    print(f"\n⚙️ 并行生成 {len(variants)} 个图片变体...")
+    start = time.perf_counter()
     try:
-        generator.create_presentation_image("complete_41_papers_presentation.png")
+        results = generator.create_variants(variants, max_workers=args.workers,
+                                            derived_dpis=derived_dpis,
+                                            thumbnail_width=args.thumbnail)
     except Exception as e:
-        print(f"❌ 演示版生成失败: {e}")
+        print(f"❌ 图片生成失败: {e}")
+        return
+    total = time.perf_counter() - start
     
     print("\n✅ 图片生成完成!")
     print("📁 输出文件:")
-    print("   📄 complete_41_papers_publication.png - 发表级质量 (300 DPI)")
-    print("   📺 complete_41_papers_presentation.png - 演示级质量 (200 DPI)")
+    for (image_type, fmt), (path, seconds) in zip(variants, results):
+        _, _, dpi = IMAGE_PRESETS[image_type]
+        print(f"   {'📄' if image_type == 'publication' else '📺'} {path} - {fmt.upper()} {dpi} DPI, 用时 {seconds:.2f}s")
+        if fmt == 'png':
+            for extra_dpi in (d for d in derived_dpis if d < dpi):
+                print(f"      ↳ {derived_path(path, f'{extra_dpi}dpi')} - PNG {extra_dpi} DPI (缩小派生)")
+            if args.thumbnail:
+                print(f"      ↳ {derived_path(path, 'thumb')} - 缩略图 {args.thumbnail}px")
+    print(f"   ⏱️ 总用时 {total:.2f}s (各变体合计 {sum(s for _, s in results):.2f}s)")
     print("\n💡 特点:")
     print("   • 包含全部41篇论文数据")
     print("   • 图例位于表格下方")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+解析结果的磁盘缓存
+以源文件的 (大小, mtime) 做快速校验，不一致时再比对内容哈希；
+解析器版本号变化时缓存自动失效
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from bibtex_citation_manager import PaperCitationManager
+from paper_store import PARSER_VERSION, PaperStore
+
+# 缓存文件格式版本（修改序列化结构时递增）
+CACHE_FORMAT_VERSION = 3
+
+DEFAULT_CACHE_DIR = Path(".cache")
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    """计算文件内容的SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FileCache:
+    """以源文件指纹为键的二进制缓存"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.hits = 0
+        self.misses = 0
+
+    def _cache_path(self, namespace: str, sources: Tuple[Path, ...]) -> Path:
+        name = hashlib.sha1('\n'.join(str(p.resolve()) for p in sources).encode('utf-8')).hexdigest()[:16]
+        return self.cache_dir / f"{namespace}-{name}.pkl"
+
+    @staticmethod
+    def _stat(path: Path) -> Tuple[int, int]:
+        st = path.stat()
+        return st.st_size, st.st_mtime_ns
+
+    def _is_fresh(self, entry: Dict, sources: Tuple[Path, ...], version: Any) -> bool:
+        """校验缓存条目；mtime变化但内容未变时顺带刷新记录的stat"""
+        if entry.get('format') != CACHE_FORMAT_VERSION or entry.get('version') != version:
+            return False
+        recorded = entry.get('sources', {})
+        if set(recorded) != {str(p) for p in sources}:
+            return False
+        for path in sources:
+            stat, digest = recorded[str(path)]
+            current = self._stat(path)
+            if tuple(stat) == current:
+                continue
+            if file_digest(path) != digest:
+                return False
+            recorded[str(path)] = (current, digest)
+            entry['dirty'] = True
+        return True
+
+    def _write(self, cache_path: Path, entry: Dict):
+        """原子写入：先写临时文件再替换"""
+        entry.pop('dirty', None)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def load(self, namespace: str, sources: Iterable, build: Callable[[], Any],
+             version: Any = PARSER_VERSION) -> Any:
+        """
+        读取缓存，失效时调用 build() 重建并写回
+
+        Args:
+            namespace: 缓存类别（如 dataset / icons）
+            sources: 结果所依赖的源文件
+            build: 重建函数
+            version: 生成结果的代码版本
+        """
+        sources = tuple(Path(p) for p in sources)
+        cache_path = self._cache_path(namespace, sources)
+
+        if cache_path.exists():
+            try:
+                with open(cache_path, 'rb') as f:
+                    entry = pickle.load(f)
+                if self._is_fresh(entry, sources, version):
+                    self.hits += 1
+                    if entry.get('dirty'):
+                        self._write(cache_path, entry)
+                    return entry['value']
+            except Exception as e:
+                print(f"⚠️ 缓存读取失败，将重新解析: {e}")
+
+        self.misses += 1
+        # 先记录源文件指纹再解析，解析期间文件被改写时下次会重新解析
+        recorded = {str(p): (self._stat(p), file_digest(p)) for p in sources}
+        value = build()
+        entry = {
+            'format': CACHE_FORMAT_VERSION,
+            'version': version,
+            'sources': recorded,
+            'value': value,
+        }
+        try:
+            self._write(cache_path, entry)
+        except OSError as e:
+            print(f"⚠️ 缓存写入失败: {e}")
+        return value
+
+
+# 默认共享缓存
+default_cache = FileCache()
+
+
+def load_dataset(csv_file: str, cache: Optional[FileCache] = default_cache
+                 ) -> Tuple[PaperStore, PaperCitationManager]:
+    """读取数据集及其引用序号（命中缓存时无需重新解析CSV）"""
+    def build():
+        store = PaperStore.from_csv(csv_file)
+        return store, PaperCitationManager(store.to_dicts())
+
+    if cache is None:
+        return build()
+    return cache.load('dataset', [csv_file], build)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+预编码的JSON响应
+同一版本的数据只序列化一次，gzip / brotli 压缩结果在首次被请求时生成并保留，
+之后的请求直接返回已编码的字节；每种编码有各自的强ETag
+"""
+
+import gzip
+import json
+import threading
+from typing import Dict
+
+try:
+    import brotli  # 可选依赖：未安装时只提供 gzip
+except ImportError:
+    brotli = None
+
+IDENTITY = 'identity'
+GZIP = 'gzip'
+BROTLI = 'br'
+
+# 按优先顺序排列的可用编码
+ENCODINGS = ((BROTLI, GZIP) if brotli is not None else (GZIP,))
+
+# 数据每个版本只压缩一次，gzip 用最高压缩率；brotli 最高档对大数据太慢，取次高档
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == GZIP:
+        # mtime 固定为0，同样的内容压缩结果逐字节相同
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    if encoding == BROTLI:
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return data
+
+
+class PreencodedJSON:
+    """某一版本数据的JSON字节及其压缩版本（创建后内容不再变化）"""
+
+    def __init__(self, payload, tag: str):
+        """
+        Args:
+            payload: 可序列化为JSON的对象，或返回该对象的函数（首次请求时才生成和序列化）
+            tag: 内容标识（如数据集哈希），用于生成ETag
+        """
+        self._payload = payload
+        self.tag = tag
+        self._bodies: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def negotiate(self, accept_encodings) -> str:
+        """根据 Accept-Encoding 选择编码（如 Flask 的 request.accept_encodings）"""
+        for encoding in ENCODINGS:
+            if accept_encodings[encoding]:
+                return encoding
+        return IDENTITY
+
+    def etag(self, encoding: str) -> str:
+        """强ETag：内容相同但编码不同的表示也需要不同的ETag"""
+        return f"{self.tag}-{encoding}"
+
+    def body(self, encoding: str = IDENTITY) -> bytes:
+        """某种编码的字节（第一次调用时生成，并发请求只生成一次）"""
+        body = self._bodies.get(encoding)
+        if body is None:
+            with self._lock:
+                body = self._bodies.get(encoding)
+                if body is None:
+                    body = _compress(self._json(), encoding)
+                    self._bodies[encoding] = body
+        return body
+
+    def _json(self) -> bytes:
+        # 在锁内调用
+        data = self._bodies.get(IDENTITY)
+        if data is None:
+            payload = self._payload() if callable(self._payload) else self._payload
+            data = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            self._bodies[IDENTITY] = data
+            self._payload = None
+        return data
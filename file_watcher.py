@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+轻量文件监视器
+后台线程轮询文件的 (大小, mtime)，变化并稳定后触发回调，不依赖额外的第三方库
+"""
+
+import os
+import threading
+from typing import Callable, Optional, Tuple
+
+
+class FileWatcher:
+    """轮询式文件监视器"""
+
+    def __init__(self, path: str, callback: Callable[[], None], interval: float = 1.0):
+        """
+        Args:
+            path: 被监视的文件
+            callback: 文件变化后在监视线程中调用
+            interval: 轮询间隔（秒）
+        """
+        self.path = path
+        self.callback = callback
+        self.interval = interval
+        self._last = self._stat()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def start(self):
+        """启动监视线程（守护线程，不阻塞进程退出）"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name=f"watch:{self.path}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """停止监视"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        pending = None
+        while not self._stop_event.wait(self.interval):
+            current = self._stat()
+            if current is None or current == self._last:
+                pending = None
+                continue
+            # 编辑器保存时可能分多次写入：连续两次轮询结果一致才触发
+            if current != pending:
+                pending = current
+                continue
+            self._last = current
+            pending = None
+            try:
+                self.callback()
+            except Exception as e:
+                print(f"❌ 文件变化处理失败: {e}")
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+标志位布尔查询
+每篇论文的17个类比/创作/表示标志位打包成一个整数位掩码，
+按标志名书写的布尔表达式（如 "Ret and Map and not Fab"）编译后用向量化位运算求值。
+数据集中不同的位掩码组合最多 2^17 种，表达式只在这些组合上求值，
+命中数直接由各组合的论文数相加得到，与论文总数无关
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from paper_store import ANALOGY_LABELS, CREATE_LABELS, FLAG_LABELS, REPR_LABELS, PaperStore
+
+# 每组标志的名称前缀
+GROUP_PREFIXES = {
+    'analogy_process': 'analogy',
+    'create_process': 'create',
+    'representation': 'repr',
+}
+
+# 图例中的全称
+FLAG_FULL_NAMES = {
+    'analogy.Enc': 'Encoding', 'analogy.Ret': 'Retrieval', 'analogy.Map': 'Mapping',
+    'analogy.Eva': 'Evaluation',
+    'create.Vis': 'Vision', 'create.Ins': 'Inspiration', 'create.Ide': 'Ideation',
+    'create.Pro': 'Prototype', 'create.Fab': 'Fabrication', 'create.Eva': 'Evaluation',
+    'create.Met': 'Meta',
+    'repr.Txt': 'Text', 'repr.Vis': 'Visual', 'repr.Str': 'Structure', 'repr.Fun': 'Function',
+    'repr.Wor': 'Workflow', 'repr.Unc': 'Unconventional',
+}
+
+_TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|(&&?|\|\|?|[~!])|([\w.]+))')
+_OPERATORS = {'&': 'and', '&&': 'and', '|': 'or', '||': 'or', '~': 'not', '!': 'not'}
+
+
+class FlagQueryError(ValueError):
+    """表达式无效"""
+
+
+def _qualified_names() -> List[str]:
+    """按矩阵列顺序的限定名（analogy.Enc ... repr.Unc）"""
+    names = []
+    for group, labels in (('analogy_process', ANALOGY_LABELS), ('create_process', CREATE_LABELS),
+                          ('representation', REPR_LABELS)):
+        names.extend(f"{GROUP_PREFIXES[group]}.{label}" for label in labels)
+    return names
+
+
+FLAG_NAMES = _qualified_names()
+
+
+def _name_table() -> Dict[str, int]:
+    """可用名称（不区分大小写）-> 列号：限定名，以及不产生歧义的缩写和全称"""
+    table = {name.lower(): bit for bit, name in enumerate(FLAG_NAMES)}
+    aliases: Dict[str, List[int]] = {}
+    for bit, name in enumerate(FLAG_NAMES):
+        for alias in (FLAG_LABELS[bit], FLAG_FULL_NAMES[name]):
+            aliases.setdefault(alias.lower(), []).append(bit)
+    for alias, bits in aliases.items():
+        if len(bits) == 1:
+            table.setdefault(alias, bits[0])
+    return table
+
+
+_NAMES = _name_table()
+
+
+def pack_flags(flags: np.ndarray) -> np.ndarray:
+    """布尔标志矩阵 (N, 17) -> 每行一个位掩码（第 i 列对应第 i 位）"""
+    weights = np.left_shift(np.uint32(1), np.arange(flags.shape[1], dtype=np.uint32))
+    return flags.astype(np.uint32) @ weights
+
+
+def flag_bit(name: str) -> int:
+    """标志名对应的列号"""
+    bit = _NAMES.get(name.lower())
+    if bit is None:
+        ambiguous = [n for n in FLAG_NAMES if n.split('.')[1].lower() == name.lower()
+                     or FLAG_FULL_NAMES[n].lower() == name.lower()]
+        if ambiguous:
+            raise FlagQueryError(f"标志名 {name!r} 有歧义，请使用 {' / '.join(ambiguous)}")
+        raise FlagQueryError(f"未知的标志名: {name!r}")
+    return bit
+
+
+def _tokenize(expression: str) -> List[str]:
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = _TOKEN_RE.match(expression, position)
+        if not match:
+            raise FlagQueryError(f"无法解析表达式第{position + 1}个字符: {expression[position:]!r}")
+        left, right, operator, word = match.groups()
+        if operator:
+            tokens.append(_OPERATORS[operator])
+        elif word and word.lower() in ('and', 'or', 'not'):
+            tokens.append(word.lower())
+        else:
+            tokens.append(left or right or word)
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """
+    递归下降解析，优先级 not > and > or
+    语法树节点: ('flag', 列号) / ('not', 子节点) / ('and', [子节点]) / ('or', [子节点])
+    """
+
+    def __init__(self, tokens: List[str]):
+        self.tokens = tokens
+        self.position = 0
+
+    def _peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _take(self):
+        token = self._peek()
+        if token is None:
+            raise FlagQueryError("表达式不完整")
+        self.position += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            raise FlagQueryError("表达式为空")
+        node = self._or()
+        if self._peek() is not None:
+            raise FlagQueryError(f"多余的内容: {self._peek()!r}")
+        return node
+
+    def _or(self):
+        nodes = [self._and()]
+        while self._peek() == 'or':
+            self._take()
+            nodes.append(self._and())
+        return nodes[0] if len(nodes) == 1 else ('or', nodes)
+
+    def _and(self):
+        nodes = [self._not()]
+        while self._peek() == 'and':
+            self._take()
+            nodes.append(self._not())
+        return nodes[0] if len(nodes) == 1 else ('and', nodes)
+
+    def _not(self):
+        if self._peek() == 'not':
+            self._take()
+            return ('not', self._not())
+        return self._atom()
+
+    def _atom(self):
+        token = self._take()
+        if token == '(':
+            node = self._or()
+            if self._take() != ')':
+                raise FlagQueryError("括号不匹配")
+            return node
+        if token in (')', 'and', 'or', 'not'):
+            raise FlagQueryError(f"此处不能出现 {token!r}")
+        return ('flag', flag_bit(token))
+
+
+def _format(node) -> str:
+    kind, value = node
+    if kind == 'flag':
+        return FLAG_NAMES[value]
+    if kind == 'not':
+        inner = _format(value)
+        return f"not {inner}" if value[0] in ('flag', 'not') else f"not ({inner})"
+    parts = [_format(child) if child[0] != 'or' or kind == 'or' else f"({_format(child)})"
+             for child in value]
+    return f" {kind} ".join(parts)
+
+
+def _evaluate(node, masks: np.ndarray) -> np.ndarray:
+    """在位掩码数组上求值，返回布尔数组"""
+    kind, value = node
+    if kind == 'flag':
+        return (masks & np.uint32(1 << value)) != 0
+    if kind == 'not':
+        return ~_evaluate(value, masks)
+    if kind == 'and':
+        # 只由标志和取反标志组成的合取式合并成两个掩码，一次比较完成
+        required = sum(1 << child[1] for child in value if child[0] == 'flag')
+        excluded = sum(1 << child[1][1] for child in value
+                       if child[0] == 'not' and child[1][0] == 'flag')
+        result = (masks & np.uint32(required | excluded)) == np.uint32(required)
+        for child in value:
+            if child[0] != 'flag' and not (child[0] == 'not' and child[1][0] == 'flag'):
+                result &= _evaluate(child, masks)
+        return result
+    result = _evaluate(value[0], masks)
+    for child in value[1:]:
+        result |= _evaluate(child, masks)
+    return result
+
+
+class FlagExpression:
+    """编译后的标志位布尔表达式"""
+
+    __slots__ = ('source', 'tree', 'normalized')
+
+    def __init__(self, source: str):
+        self.source = source
+        self.tree = _Parser(_tokenize(source)).parse()
+        self.normalized = _format(self.tree)
+
+    def evaluate(self, masks: np.ndarray) -> np.ndarray:
+        return _evaluate(self.tree, masks)
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(expression: str) -> FlagExpression:
+    """解析表达式（相同表达式只解析一次）"""
+    return FlagExpression(expression)
+
+
+class FlagIndex:
+    """某一版本数据集的标志位掩码（创建后不再修改）"""
+
+    def __init__(self, store: PaperStore):
+        self.masks = pack_flags(store.flags) if len(store) else np.zeros(0, dtype=np.uint32)
+        # 不同的组合、每行所属组合、每种组合的论文数
+        self.combinations, self._inverse, self._counts = np.unique(
+            self.masks, return_inverse=True, return_counts=True)
+        self._results: Dict[str, Tuple[np.ndarray, int]] = {}
+
+    def _match(self, expression: str) -> Tuple[np.ndarray, int]:
+        compiled = compile_expression(expression)
+        cached = self._results.get(compiled.normalized)
+        if cached is None:
+            matched = compiled.evaluate(self.combinations)
+            cached = (matched, int(self._counts[matched].sum()))
+            if len(self._results) < 1024:
+                self._results[compiled.normalized] = cached
+        return cached
+
+    def count(self, expression: str) -> int:
+        """满足表达式的论文数"""
+        return self._match(expression)[1]
+
+    def rows(self, expression: str) -> np.ndarray:
+        """满足表达式的行号（升序）"""
+        matched, count = self._match(expression)
+        if count == 0:
+            return np.zeros(0, dtype=np.int64)
+        return np.flatnonzero(matched[self._inverse])
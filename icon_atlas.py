@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Auto Level图标集
+原图只解码一次；按目标像素尺寸用高质量滤波预先缩放，
+同一进程内的所有生成器共享缩放结果，绘制时直接贴图，无需再重采样
+"""
+
+import hashlib
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+# 进程级缩放结果缓存：(图标内容摘要, 目标像素尺寸) -> RGBA uint8
+_scaled_cache: Dict[Tuple[str, int], np.ndarray] = {}
+_scaled_lock = threading.Lock()
+
+
+def _to_rgba8(image: np.ndarray) -> np.ndarray:
+    """把 plt.imread 读到的数组统一为 RGBA uint8"""
+    if image.dtype != np.uint8:
+        image = np.clip(np.round(image * 255), 0, 255).astype(np.uint8)
+    if image.ndim == 2:
+        image = np.stack([image] * 3, axis=-1)
+    if image.shape[2] == 3:
+        alpha = np.full(image.shape[:2] + (1,), 255, dtype=np.uint8)
+        image = np.concatenate([image, alpha], axis=-1)
+    return np.ascontiguousarray(image)
+
+
+class IconAtlas:
+    """按级别存放图标，提供指定像素尺寸的预缩放版本"""
+
+    def __init__(self, icons: Dict[str, Optional[np.ndarray]]):
+        self._images: Dict[str, np.ndarray] = {}
+        self._digests: Dict[str, str] = {}
+        for level, image in icons.items():
+            if image is None:
+                continue
+            rgba = _to_rgba8(image)
+            self._images[level] = rgba
+            self._digests[level] = hashlib.sha1(rgba.tobytes() + str(rgba.shape).encode()).hexdigest()
+
+    def __contains__(self, level: str) -> bool:
+        return level in self._images
+
+    def scaled(self, level: str, size_px: int) -> Optional[np.ndarray]:
+        """
+        返回长边为 size_px 像素的图标（保持宽高比）
+        行顺序自下而上，可直接交给 renderer.draw_image
+        """
+        image = self._images.get(level)
+        if image is None:
+            return None
+        key = (self._digests[level], size_px)
+        cached = _scaled_cache.get(key)
+        if cached is not None:
+            return cached
+
+        height, width = image.shape[:2]
+        scale = min(size_px / width, size_px / height)
+        target = (max(1, round(width * scale)), max(1, round(height * scale)))
+        resized = Image.fromarray(image, 'RGBA').resize(target, Image.LANCZOS)
+        scaled = np.ascontiguousarray(np.asarray(resized, dtype=np.uint8)[::-1])
+        with _scaled_lock:
+            _scaled_cache[key] = scaled
+        return scaled
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+导入耗时报告
+在全新的解释器中用 -X importtime 导入指定模块，汇总总耗时和最重的顶层包，
+并标出是否加载了绘图库，用于发现启动变慢的回归
+
+用法: python import_report.py [模块 ...]
+"""
+
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+DEFAULT_MODULES = ['api_server', 'complete_41_papers_generator']
+
+# 只应在第一次渲染时加载的包
+PLOTTING_PACKAGES = ('matplotlib', 'PIL', 'pandas', 'seaborn')
+
+TOP_PACKAGES = 8
+
+
+def measure(module: str) -> Tuple[float, Dict[str, float]]:
+    """
+    在子进程中导入模块
+
+    Returns:
+        (总耗时毫秒, {顶层包: 自身耗时毫秒})
+    """
+    # 从任意目录运行时都能找到本项目的模块
+    env = dict(os.environ)
+    project_dir = os.path.dirname(os.path.abspath(__file__))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [project_dir, env.get('PYTHONPATH')]))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    packages: Dict[str, float] = defaultdict(float)
+    total = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        packages[name.split('.')[0]] += int(self_us) / 1000
+        if name == module:
+            total = int(cumulative_us) / 1000
+    return total, dict(packages)
+
+
+def report(modules: List[str]):
+    print("⏱️ 导入耗时报告")
+    print("=" * 50)
+    for module in modules:
+        try:
+            total, packages = measure(module)
+        except RuntimeError as e:
+            print(f"❌ {module}: 导入失败 ({e})")
+            continue
+
+        plotting = [name for name in PLOTTING_PACKAGES if name in packages]
+        print(f"\n📦 {module}: {total:.1f} ms")
+        for name, ms in sorted(packages.items(), key=lambda item: -item[1])[:TOP_PACKAGES]:
+            print(f"   {name:<28} {ms:>8.1f} ms")
+        if plotting:
+            print(f"   ⚠️ 已加载绘图相关包: {', '.join(plotting)}")
+        else:
+            print("   ✅ 未加载绘图相关包")
+
+
+if __name__ == "__main__":
+    report(sys.argv[1:] or DEFAULT_MODULES)
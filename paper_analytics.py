@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+标志位交叉分析
+在布尔标志矩阵 F (N×17) 上用矩阵乘法一次算出：
+标志共现矩阵 FᵀF、标志×年份和标志×领域大类的交叉表 FᵀY（Y 为独热编码），
+以及条件比例 P(B|A) 和各年份/领域内的使用比例
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from flag_query import FLAG_NAMES
+from paper_store import FLAG_GROUPS, UNKNOWN_YEAR, PaperStore
+
+ANALYTICS_SECTIONS = ('cooccurrence', 'conditional', 'by_year', 'by_domain')
+
+
+def _one_hot(codes: np.ndarray, size: int) -> np.ndarray:
+    matrix = np.zeros((len(codes), size), dtype=np.int32)
+    matrix[np.arange(len(codes)), codes] = 1
+    return matrix
+
+
+def _rates(counts: np.ndarray, totals: np.ndarray) -> np.ndarray:
+    """按列归一化，分母为0时比例为0"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rates = np.where(totals > 0, counts / totals, 0.0)
+    return np.round(rates, 4)
+
+
+class FlagAnalytics:
+    """某一版本数据集的交叉分析结果（创建后不再修改，随快照整体替换）"""
+
+    def __init__(self, store: PaperStore, version: int = 0):
+        self.version = version
+        self.total = len(store)
+        flags = store.flags.astype(np.int32)
+
+        # 共现：对角线即各标志的使用次数
+        self.cooccurrence = flags.T @ flags
+        self.flag_totals = np.diag(self.cooccurrence).copy()
+        # 条件比例：第 a 行第 b 列为 P(b | a)
+        self.conditional = _rates(self.cooccurrence, self.flag_totals[:, None])
+
+        # 年份按数值排序（无年份的排最后）
+        years = store.categories['year']
+        year_order = sorted(range(len(years)),
+                            key=lambda code: int(years[code]) if years[code].isdigit() else UNKNOWN_YEAR)
+        remap = np.empty(len(years), dtype=np.int32)
+        remap[year_order] = np.arange(len(years), dtype=np.int32)
+        self.years = [years[code] for code in year_order]
+        self.by_year, self.year_totals = self._crosstab(flags, remap[store.codes['year']], len(years))
+
+        self.domains = list(store.categories['domain_category'])
+        self.by_domain, self.domain_totals = self._crosstab(
+            flags, store.codes['domain_category'], len(self.domains))
+
+        self._payload: Optional[Dict] = None
+
+    @staticmethod
+    def _crosstab(flags: np.ndarray, codes: np.ndarray, size: int):
+        """标志×分类的计数 (17×K) 和各分类的论文数"""
+        one_hot = _one_hot(codes, size)
+        return flags.T @ one_hot, one_hot.sum(axis=0)
+
+    def to_dict(self, sections=ANALYTICS_SECTIONS) -> Dict:
+        """API返回的分析结果（完整结果只生成一次）"""
+        if self._payload is None:
+            self._payload = {
+                'version': self.version,
+                'total_papers': self.total,
+                'flags': FLAG_NAMES,
+                'groups': {group: [s.start, s.stop] for group, s in FLAG_GROUPS.items()},
+                'flag_totals': self.flag_totals.tolist(),
+                'cooccurrence': self.cooccurrence.tolist(),
+                'conditional': self.conditional.tolist(),
+                'by_year': {
+                    'years': self.years,
+                    'totals': self.year_totals.tolist(),
+                    'counts': self.by_year.tolist(),
+                    'rates': _rates(self.by_year, self.year_totals).tolist(),
+                },
+                'by_domain': {
+                    'categories': self.domains,
+                    'totals': self.domain_totals.tolist(),
+                    'counts': self.by_domain.tolist(),
+                    'rates': _rates(self.by_domain, self.domain_totals).tolist(),
+                },
+            }
+        if tuple(sections) == ANALYTICS_SECTIONS:
+            return self._payload
+        excluded = set(ANALYTICS_SECTIONS) - set(sections)
+        return {key: value for key, value in self._payload.items() if key not in excluded}
+
+    def top_pairs(self, row_group: str, column_group: str, limit: int = 5) -> List:
+        """两组标志间共现最多的组合 [(行标志, 列标志, 次数)]"""
+        rows, columns = FLAG_GROUPS[row_group], FLAG_GROUPS[column_group]
+        block = self.cooccurrence[rows, columns]
+        order = np.argsort(-block, axis=None, kind='stable')[:limit]
+        pairs = []
+        for flat in order:
+            i, j = np.unravel_index(flat, block.shape)
+            if block[i, j] == 0:
+                break
+            pairs.append((FLAG_NAMES[rows.start + i], FLAG_NAMES[columns.start + j], int(block[i, j])))
+        return pairs
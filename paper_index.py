@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+论文查询的二级索引
+每个数据集版本只建一次：分类字段的倒排行号表、按年份排好的行号、
+各排序键下的名次、标志位掩码，以及全文检索的倒排索引。
+筛选时对行号数组求交集，排序和分页只涉及命中的行，不再逐行扫描全部论文
+"""
+
+import base64
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from flag_query import FlagIndex, FlagQueryError
+from paper_store import UNKNOWN_YEAR, PaperStore
+from search_index import SearchIndex
+
+# 可筛选的分类字段：查询参数 -> PaperRecord 字段
+FILTER_FIELDS = {
+    'venue': 'venue',
+    'automation': 'automation',
+    'domain_category': 'domain_category',
+}
+
+# 排序键
+SORT_KEYS = ('year', 'citation', 'venue')
+
+# PaperQuery.from_args 识别的请求参数（其他参数一律忽略）
+QUERY_PARAMS = ('year_from', 'year_to', *FILTER_FIELDS, 'q', 'flags', 'sort', 'order', 'limit', 'cursor')
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+class QueryError(ValueError):
+    """查询参数无效"""
+
+
+def _postings(codes: np.ndarray, size: int) -> List[np.ndarray]:
+    """每个分类编码对应的行号（升序）"""
+    order = np.argsort(codes, kind='stable').astype(np.int32)
+    bounds = np.searchsorted(codes[order], np.arange(size + 1))
+    return [order[bounds[i]:bounds[i + 1]] for i in range(size)]
+
+
+def _ranks(order: np.ndarray) -> np.ndarray:
+    """排序后的行号 -> 每行的名次"""
+    ranks = np.empty(len(order), dtype=np.int32)
+    ranks[order] = np.arange(len(order), dtype=np.int32)
+    return ranks
+
+
+class PaperQuery:
+    """一次查询的条件"""
+
+    __slots__ = ('year_from', 'year_to', 'values', 'text', 'flags', 'sort', 'descending', 'limit',
+                 'cursor')
+
+    def __init__(self, year_from: Optional[int] = None, year_to: Optional[int] = None,
+                 values: Optional[Dict[str, Sequence[str]]] = None, text: str = '',
+                 flags: str = '', sort: str = 'year', descending: bool = False,
+                 limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None):
+        self.year_from = year_from
+        self.year_to = year_to
+        self.values = values or {}
+        self.text = text
+        self.flags = flags
+        self.sort = sort
+        self.descending = descending
+        self.limit = limit
+        self.cursor = cursor
+
+    @classmethod
+    def from_args(cls, args) -> 'PaperQuery':
+        """
+        从请求参数构建查询（args 支持 get/getlist，如 Flask 的 request.args）
+        year_from / year_to / venue / automation / domain_category（可重复）/ q /
+        flags（标志位表达式，见 flag_query）/ sort / order=asc|desc / limit / cursor
+        """
+        def integer(name, default=None):
+            value = args.get(name)
+            if value in (None, ''):
+                return default
+            try:
+                return int(value)
+            except ValueError:
+                raise QueryError(f"参数 {name} 必须是整数: {value!r}")
+
+        sort = args.get('sort') or 'year'
+        if sort not in SORT_KEYS:
+            raise QueryError(f"不支持的排序键: {sort!r}（可选 {', '.join(SORT_KEYS)}）")
+        order = (args.get('order') or 'asc').lower()
+        if order not in ('asc', 'desc'):
+            raise QueryError(f"order 只能是 asc 或 desc: {order!r}")
+
+        values = {name: args.getlist(name) for name in FILTER_FIELDS if args.getlist(name)}
+        limit = max(1, min(integer('limit', DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+        return cls(year_from=integer('year_from'), year_to=integer('year_to'), values=values,
+                   text=args.get('q') or '', flags=args.get('flags') or '', sort=sort, descending=order == 'desc',
+                   limit=limit, cursor=args.get('cursor') or None)
+
+
+class PaperPage:
+    """一页查询结果"""
+
+    __slots__ = ('rows', 'total', 'next_cursor')
+
+    def __init__(self, rows: np.ndarray, total: int, next_cursor: Optional[str]):
+        self.rows = rows
+        self.total = total
+        self.next_cursor = next_cursor
+
+
+class PaperIndex:
+    """某一版本数据集的二级索引（创建后不再修改，随快照整体替换）"""
+
+    def __init__(self, store: PaperStore, citation_manager=None, version: int = 0):
+        """
+        Args:
+            store: 列式数据集
+            citation_manager: 用于按引用序号排序（没有序号的论文按编号排）
+            version: 数据集版本号（写入分页游标，数据更新后旧游标失效）
+        """
+        self.version = version
+        self.size = len(store)
+
+        # 分类字段：值 -> 行号；同时支持不区分大小写的匹配
+        self._postings: Dict[str, Dict[str, np.ndarray]] = {}
+        for field in FILTER_FIELDS.values():
+            postings = _postings(store.codes[field], len(store.categories[field]))
+            by_value: Dict[str, List[np.ndarray]] = {}
+            for value, rows in zip(store.categories[field], postings):
+                by_value.setdefault(value.casefold(), []).append(rows)
+            self._postings[field] = {value: np.sort(np.concatenate(parts)) if len(parts) > 1 else parts[0]
+                                     for value, parts in by_value.items()}
+
+        # 年份：按年份排好的行号 + 对应的年份，范围查询用二分查找
+        self._year_order = store.order_by_year().astype(np.int32)
+        self._sorted_years = store.year_values[self._year_order]
+
+        # 各排序键的行号顺序和名次（同值时保持数据表中的顺序）
+        citation_numbers = np.array([self._citation_number(citation_manager, record.no)
+                                     for record in store.records], dtype=np.int64)
+        venues = store.categories['venue']
+        venue_order = sorted(range(len(venues)), key=lambda code: venues[code].casefold())
+        venue_keys = _ranks(np.array(venue_order, dtype=np.int32))[store.codes['venue']]
+        self._orders = {
+            'year': self._year_order,
+            'citation': np.argsort(citation_numbers, kind='stable').astype(np.int32),
+            # 会议相同时按年份
+            'venue': np.lexsort((store.year_values, venue_keys)).astype(np.int32),
+        }
+        self._ranks = {key: _ranks(order) for key, order in self._orders.items()}
+
+        # 标志位：每行一个位掩码
+        self.flags = FlagIndex(store)
+
+        # 文本：标题、作者、会议、领域的倒排索引（查询词按前缀匹配）
+        self.search = SearchIndex(store)
+
+    @staticmethod
+    def _citation_number(citation_manager, paper_no: str) -> int:
+        number = citation_manager.get_paper_citation_number(paper_no) if citation_manager else 0
+        if number > 0:
+            return number
+        return int(paper_no) if paper_no.isdigit() else UNKNOWN_YEAR
+
+    def _year_rows(self, year_from: Optional[int], year_to: Optional[int]) -> np.ndarray:
+        low = 0 if year_from is None else np.searchsorted(self._sorted_years, year_from, 'left')
+        high = (np.searchsorted(self._sorted_years, UNKNOWN_YEAR, 'left') if year_to is None
+                else np.searchsorted(self._sorted_years, year_to, 'right'))
+        return np.sort(self._year_order[low:high])
+
+    def _value_rows(self, field: str, values: Iterable[str]) -> np.ndarray:
+        postings = self._postings[field]
+        parts = [postings[value.casefold()] for value in values if value.casefold() in postings]
+        if not parts:
+            return np.zeros(0, dtype=np.int32)
+        return parts[0] if len(parts) == 1 else np.unique(np.concatenate(parts))
+
+    def match(self, query: PaperQuery) -> Optional[np.ndarray]:
+        """满足全部筛选条件的行号（升序）；没有任何条件时返回 None"""
+        candidates: List[np.ndarray] = []
+        if query.year_from is not None or query.year_to is not None:
+            candidates.append(self._year_rows(query.year_from, query.year_to))
+        for name, values in query.values.items():
+            candidates.append(self._value_rows(FILTER_FIELDS[name], values))
+        if query.flags:
+            try:
+                candidates.append(self.flags.rows(query.flags))
+            except FlagQueryError as e:
+                raise QueryError(str(e))
+        text_rows = self.search.match(query.text)
+        if text_rows is not None:
+            candidates.append(text_rows)
+        if not candidates:
+            return None
+
+        # 从最短的行号表开始求交集
+        candidates.sort(key=len)
+        rows = candidates[0]
+        for other in candidates[1:]:
+            if not len(rows):
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
+    def _encode_cursor(self, sort: str, descending: bool, rank: int) -> str:
+        token = f"{self.version}:{sort}:{int(descending)}:{rank}"
+        return base64.urlsafe_b64encode(token.encode('ascii')).decode('ascii').rstrip('=')
+
+    def _decode_cursor(self, cursor: str, sort: str, descending: bool) -> int:
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            version, cursor_sort, cursor_desc, rank = base64.urlsafe_b64decode(padded).decode('ascii').split(':')
+            version, cursor_desc, rank = int(version), bool(int(cursor_desc)), int(rank)
+        except (ValueError, UnicodeDecodeError):
+            raise QueryError("分页游标无效")
+        if version != self.version:
+            raise QueryError("数据已更新，分页游标已失效，请重新查询")
+        if cursor_sort != sort or cursor_desc != descending:
+            raise QueryError("分页游标与排序方式不一致")
+        return rank
+
+    def query(self, query: PaperQuery) -> PaperPage:
+        """
+        筛选、排序并取一页
+
+        分页游标记录上一页最后一行在排序键下的名次，下一页从该名次之后开始
+        """
+        ranks = self._ranks[query.sort]
+        rows = self.match(query)
+        if rows is None:
+            # 无筛选条件：排好序的行号直接就是结果
+            ordered_ranks = None
+            ordered = self._orders[query.sort]
+            total = self.size
+        else:
+            row_ranks = ranks[rows]
+            position = np.argsort(row_ranks, kind='stable')
+            ordered, ordered_ranks = rows[position], row_ranks[position]
+            total = len(rows)
+
+        if query.descending:
+            ordered = ordered[::-1]
+            ordered_ranks = None if ordered_ranks is None else ordered_ranks[::-1]
+
+        start = 0
+        if query.cursor:
+            rank = self._decode_cursor(query.cursor, query.sort, query.descending)
+            if ordered_ranks is None:
+                # 名次即下标
+                start = self.size - rank if query.descending else rank + 1
+            elif query.descending:
+                start = int(np.searchsorted(-ordered_ranks, -rank, 'right'))
+            else:
+                start = int(np.searchsorted(ordered_ranks, rank, 'right'))
+
+        page = ordered[start:start + query.limit]
+        next_cursor = None
+        if start + query.limit < total and len(page):
+            next_cursor = self._encode_cursor(query.sort, query.descending, int(ranks[page[-1]]))
+        return PaperPage(page, total, next_cursor)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+论文统计引擎
+由列式存储一次算出会议、年份、自动化级别、领域大类的分布和每个标志位的使用次数；
+数据文件变化时只按行级差异增减计数，不再重新遍历全部论文
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from paper_store import (ANALOGY_LABELS, CREATE_LABELS, FLAG_GROUPS, REPR_LABELS, PaperStore,
+                         StoreDiff)
+
+# 统计结果中的键 -> PaperRecord 字段
+STATISTIC_FIELDS = (
+    ('venues', 'venue'),
+    ('years', 'year'),
+    ('auto_levels', 'automation'),
+    ('domain_categories', 'domain_category'),
+)
+
+_GROUP_LABELS = {
+    'analogy_process': ANALOGY_LABELS,
+    'create_process': CREATE_LABELS,
+    'representation': REPR_LABELS,
+}
+
+
+class PaperStatistics:
+    """某一版本数据集的汇总统计（创建后不再修改，更新时生成新对象）"""
+
+    __slots__ = ('version', 'total', 'counts', 'flag_totals', '_payload')
+
+    def __init__(self, version: int, total: int, counts: Dict[str, Dict[str, int]],
+                 flag_totals: np.ndarray):
+        self.version = version
+        self.total = total
+        self.counts = counts
+        self.flag_totals = flag_totals
+        self._payload: Optional[Dict] = None
+
+    @classmethod
+    def from_store(cls, store: PaperStore, version: int = 0) -> 'PaperStatistics':
+        """从字典编码列和标志位矩阵一次算出全部统计"""
+        counts = {name: store.value_counts(field) for name, field in STATISTIC_FIELDS}
+        flag_totals = store.flags.sum(axis=0, dtype=np.int64)
+        return cls(version, len(store), counts, flag_totals)
+
+    def apply_diff(self, old_store: PaperStore, new_store: PaperStore, diff: StoreDiff,
+                   version: int) -> 'PaperStatistics':
+        """
+        按行级差异更新统计：减去删除和修改前的行，加上新增和修改后的行
+
+        Args:
+            old_store: 本统计对应的数据集
+            new_store: 新版本数据集
+            diff: diff_stores(old_store, new_store) 的结果
+            version: 新版本号
+        """
+        if not diff.has_changes:
+            return PaperStatistics(version, self.total, self.counts, self.flag_totals)
+
+        outgoing = set(diff.removed) | set(diff.changed)
+        incoming = set(diff.added) | set(diff.changed)
+        if len(outgoing) + len(incoming) >= len(new_store):
+            # 大部分行都变了（如首次加载），整体重算更快
+            return PaperStatistics.from_store(new_store, version)
+
+        counts = {name: dict(values) for name, values in self.counts.items()}
+        flag_totals = self.flag_totals.copy()
+
+        for sign, store, papers in ((-1, old_store, outgoing), (1, new_store, incoming)):
+            rows = [i for i, record in enumerate(store.records) if record.no in papers]
+            for i in rows:
+                record = store.records[i]
+                for name, field in STATISTIC_FIELDS:
+                    value = getattr(record, field)
+                    counts[name][value] = counts[name].get(value, 0) + sign
+            if rows:
+                flag_totals += sign * store.flags[rows].sum(axis=0, dtype=np.int64)
+
+        for values in counts.values():
+            for value in [v for v, count in values.items() if count <= 0]:
+                del values[value]
+        return PaperStatistics(version, len(new_store), counts, flag_totals)
+
+    def flag_counts(self) -> Dict[str, Dict[str, int]]:
+        """每个标志位被使用的论文数（按三组标志分组）"""
+        return {
+            group: dict(zip(_GROUP_LABELS[group], (int(c) for c in self.flag_totals[group_slice])))
+            for group, group_slice in FLAG_GROUPS.items()
+        }
+
+    def to_dict(self) -> Dict:
+        """API返回的统计结果（只生成一次）"""
+        if self._payload is None:
+            payload = {'version': self.version, 'total_papers': self.total}
+            payload.update({name: dict(values) for name, values in self.counts.items()})
+            payload['flags'] = self.flag_counts()
+            self._payload = payload
+        return self._payload
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+论文数据的共享列式存储
+CSV只解析一次：17个类比/创作/表示标志位存成NumPy布尔矩阵，
+其余元数据存成紧凑的 __slots__ 记录，供生成器和API服务器共用
+"""
+
+import codecs
+import csv
+import hashlib
+import io
+import mmap
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 解析器版本（解析规则变化时递增，使磁盘缓存失效）
+PARSER_VERSION = 1
+
+# 标志位列标签（与表头子分类一致）
+ANALOGY_LABELS = ['Enc', 'Ret', 'Map', 'Eva']
+CREATE_LABELS = ['Vis', 'Ins', 'Ide', 'Pro', 'Fab', 'Eva', 'Met']
+REPR_LABELS = ['Txt', 'Vis', 'Str', 'Fun', 'Wor', 'Unc']
+FLAG_LABELS = ANALOGY_LABELS + CREATE_LABELS + REPR_LABELS
+
+# 三组标志位在矩阵中的列范围
+ANALOGY_SLICE = slice(0, 4)
+CREATE_SLICE = slice(4, 11)
+REPR_SLICE = slice(11, 17)
+FLAG_GROUPS = {
+    'analogy_process': ANALOGY_SLICE,
+    'create_process': CREATE_SLICE,
+    'representation': REPR_SLICE,
+}
+
+# CSV固定列位置
+COL_NO = 0
+COL_TITLE = 1
+COL_VENUE = 2
+COL_YEAR = 3
+COL_AUTHOR = 4
+COL_FLAGS_START = 5
+COL_FLAGS_END = COL_FLAGS_START + len(FLAG_LABELS)  # 22
+COL_AUTOMATION = 22
+
+# 前两行是表头（分组行 + 子分类行）
+HEADER_ROWS = 2
+
+# 可做分组统计的元数据字段
+CATEGORICAL_FIELDS = ('venue', 'year', 'automation', 'specific_domain', 'domain_category')
+
+# 年份缺失时的排序值（排在最后）
+UNKNOWN_YEAR = 9999
+
+# 流式读取时每次从文件映射中取出的字节数
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+class PaperRecord:
+    """单篇论文的元数据（不含标志位）"""
+
+    __slots__ = ('no', 'title', 'venue', 'year', 'author', 'automation',
+                 'specific_domain', 'domain_category')
+
+    def __init__(self, no: str, title: str, venue: str, year: str, author: str,
+                 automation: str, specific_domain: str, domain_category: str):
+        self.no = no
+        self.title = title
+        self.venue = venue
+        self.year = year
+        self.author = author
+        self.automation = automation
+        self.specific_domain = specific_domain
+        self.domain_category = domain_category
+
+    def __repr__(self):
+        return f"PaperRecord(no={self.no!r}, title={self.title!r})"
+
+
+class CsvLayout:
+    """CSV列布局：两份数据表中 specific Domain 与大分类的列位置互换"""
+
+    __slots__ = ('specific_domain_col', 'domain_category_col')
+
+    def __init__(self, specific_domain_col: int = 23, domain_category_col: int = 24):
+        self.specific_domain_col = specific_domain_col
+        self.domain_category_col = domain_category_col
+
+    @classmethod
+    def from_header(cls, header: Sequence[str]) -> 'CsvLayout':
+        """根据第一行表头识别领域列的位置"""
+        if len(header) > 24 and 'specific domain' in header[24].strip().lower():
+            return cls(specific_domain_col=24, domain_category_col=23)
+        return cls()
+
+
+@dataclass
+class MalformedRow:
+    """无法解析的数据行"""
+    line_no: int                # CSV中的行号（从1开始）
+    reason: str                 # 原因说明
+    row: List[str]              # 解析出的原始单元格
+
+
+@dataclass
+class StoreDiff:
+    """两个版本数据集之间的行级差异（按论文编号）"""
+    added: List[str]
+    removed: List[str]
+    changed: List[str]
+    unchanged: int
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def _cell(row: Sequence[str], index: int) -> str:
+    """安全读取单元格"""
+    return row[index].strip() if len(row) > index else ''
+
+
+def is_paper_row(row: Sequence[str]) -> bool:
+    """是否为有效的数据行（有编号且列数足够）"""
+    return len(row) > COL_FLAGS_START and bool(row[COL_NO].strip())
+
+
+def validate_row(row: Sequence[str], width: int) -> Optional[str]:
+    """检查数据行，返回错误原因；合法时返回None"""
+    if width and len(row) > width:
+        return f"列数过多（{len(row)} > {width}），标题或会议中可能含有未加引号的逗号"
+    no = row[COL_NO].strip()
+    if not no.isdigit():
+        return f"编号无效: {no!r}"
+    year = _cell(row, COL_YEAR)
+    if year and not year.isdigit():
+        return f"年份无效: {year!r}"
+    return None
+
+
+def parse_row(row: Sequence[str], layout: CsvLayout):
+    """
+    把一行CSV拆成元数据记录和标志位
+
+    Returns:
+        (PaperRecord, List[bool]): 只有空单元格视为不支持
+    """
+    record = PaperRecord(
+        no=_cell(row, COL_NO),
+        title=_cell(row, COL_TITLE),
+        venue=_cell(row, COL_VENUE),
+        year=_cell(row, COL_YEAR),
+        author=_cell(row, COL_AUTHOR),
+        automation=_cell(row, COL_AUTOMATION),
+        specific_domain=_cell(row, layout.specific_domain_col),
+        domain_category=_cell(row, layout.domain_category_col),
+    )
+    flags = [_cell(row, i) != '' for i in range(COL_FLAGS_START, COL_FLAGS_END)]
+    return record, flags
+
+
+def iter_text_lines(csv_file: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    按固定大小分块读取文件并逐行产出文本
+    优先使用内存映射；空文件或不支持mmap时退回普通分块读取
+    """
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    with open(csv_file, 'rb') as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            buffer = None
+
+        try:
+            offset = 0
+            pending = ''
+            while True:
+                if buffer is not None:
+                    chunk = buffer[offset:offset + chunk_size]
+                    offset += len(chunk)
+                else:
+                    chunk = f.read(chunk_size)
+
+                text = pending + decoder.decode(chunk, final=not chunk)
+                if not chunk:
+                    if text:
+                        yield text
+                    return
+
+                # 只产出完整的行，最后一个换行符之后的内容留到下一块
+                end = text.rfind('\n')
+                if end < 0:
+                    pending = text
+                    continue
+                pending = text[end + 1:]
+                yield from io.StringIO(text[:end + 1], newline='')
+        finally:
+            if buffer is not None:
+                buffer.close()
+
+
+def _report_malformed(error: MalformedRow):
+    """默认的错误行处理：打印警告后继续"""
+    print(f"⚠️ 跳过第{error.line_no}行: {error.reason}")
+
+
+def iter_paper_rows(csv_file: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    on_error: Optional[Callable[[MalformedRow], None]] = _report_malformed
+                    ) -> Iterator[Tuple[PaperRecord, List[bool]]]:
+    """
+    流式读取论文CSV，逐行产出校验通过的 (PaperRecord, flags)
+
+    内存占用只与 chunk_size 有关，与文件行数无关；
+    错误行交给 on_error 处理，不会中断读取
+    """
+    reader = csv.reader(iter_text_lines(csv_file, chunk_size))
+    header = next(reader, [])
+    layout = CsvLayout.from_header(header)
+    width = len(header)
+    for _ in range(HEADER_ROWS - 1):
+        next(reader, None)
+
+    for row in reader:
+        if not is_paper_row(row):
+            continue
+        reason = validate_row(row, width)
+        if reason:
+            if on_error is not None:
+                on_error(MalformedRow(reader.line_num, reason, list(row)))
+            continue
+        yield parse_row(row, layout)
+
+
+class PaperStore:
+    """列式论文数据集"""
+
+    def __init__(self, records: List[PaperRecord], flags: np.ndarray, source: str = ''):
+        self.source = source
+        self.records = records
+        self.malformed: List[MalformedRow] = []
+        self._fingerprints: Optional[List[bytes]] = None
+        self.flags = flags.reshape(len(records), len(FLAG_LABELS)).astype(bool, copy=False)
+        self._build_columns()
+
+    @classmethod
+    def from_rows(cls, records: Iterable[PaperRecord], flag_rows: Iterable[Sequence[bool]],
+                  source: str = '') -> 'PaperStore':
+        records = list(records)
+        flags = np.array(list(flag_rows), dtype=bool)
+        if not records:
+            flags = np.zeros((0, len(FLAG_LABELS)), dtype=bool)
+        return cls(records, flags, source)
+
+    @classmethod
+    def from_csv(cls, csv_file: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 on_error: Optional[Callable[[MalformedRow], None]] = _report_malformed
+                 ) -> 'PaperStore':
+        """流式读取数据表（标准CSV解析，正确处理带引号和逗号的字段）"""
+        records = []
+        flag_bytes = bytearray()
+        malformed: List[MalformedRow] = []
+
+        def collect(error: MalformedRow):
+            malformed.append(error)
+            if on_error is not None:
+                on_error(error)
+
+        for record, flags in iter_paper_rows(csv_file, chunk_size, on_error=collect):
+            records.append(record)
+            flag_bytes.extend(flags)
+
+        flag_matrix = np.frombuffer(bytes(flag_bytes), dtype=np.uint8).astype(bool)
+        store = cls(records, flag_matrix, source=str(csv_file))
+        store.malformed = malformed
+        return store
+
+    def _build_columns(self):
+        """对分类字段做字典编码（按首次出现顺序），并预计算年份数值列"""
+        self.categories: Dict[str, List[str]] = {}
+        self.codes: Dict[str, np.ndarray] = {}
+        for field in CATEGORICAL_FIELDS:
+            index: Dict[str, int] = {}
+            codes = np.empty(len(self.records), dtype=np.int32)
+            for i, record in enumerate(self.records):
+                codes[i] = index.setdefault(getattr(record, field), len(index))
+            self.categories[field] = list(index)
+            self.codes[field] = codes
+
+        self.year_values = np.array(
+            [int(r.year) if r.year.isdigit() else UNKNOWN_YEAR for r in self.records],
+            dtype=np.int32)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def row_fingerprints(self) -> List[bytes]:
+        """每行内容（元数据 + 标志位）的摘要，用于判断行是否变化"""
+        if self._fingerprints is None:
+            fingerprints = []
+            for record, row in zip(self.records, self.flags):
+                digest = hashlib.blake2b(digest_size=16)
+                digest.update('\x1f'.join(getattr(record, f) for f in PaperRecord.__slots__).encode('utf-8'))
+                digest.update(row.tobytes())
+                fingerprints.append(digest.digest())
+            self._fingerprints = fingerprints
+        return self._fingerprints
+
+    def content_hash(self) -> str:
+        """整个数据集内容的哈希（行顺序敏感）"""
+        digest = hashlib.sha256()
+        for fp in self.row_fingerprints():
+            digest.update(fp)
+        return digest.hexdigest()
+
+    def value_counts(self, field: str) -> Dict[str, int]:
+        """分类字段计数（保持首次出现顺序）"""
+        counts = np.bincount(self.codes[field], minlength=len(self.categories[field]))
+        return {value: int(count) for value, count in zip(self.categories[field], counts)}
+
+    def order_by_year(self) -> np.ndarray:
+        """按年份稳定排序后的行下标（无年份的排最后）"""
+        return np.argsort(self.year_values, kind='stable')
+
+    def record_dict(self, index: int) -> Dict:
+        """单行转为API使用的字典格式"""
+        record = self.records[index]
+        row = self.flags[index]
+        return {
+            'no': int(record.no) if record.no.isdigit() else record.no,
+            'title': record.title,
+            'venue': record.venue,
+            'year': record.year,
+            'author': record.author,
+            'analogy_process': ['√' if v else '' for v in row[ANALOGY_SLICE]],
+            'create_process': ['√' if v else '' for v in row[CREATE_SLICE]],
+            'representation': ['√' if v else '' for v in row[REPR_SLICE]],
+            'automation': record.automation,
+            'application': record.domain_category,
+            'domain': record.specific_domain,
+        }
+
+    def to_dicts(self, indices: Optional[Iterable[int]] = None) -> List[Dict]:
+        """转为字典列表（默认全部行）"""
+        if indices is None:
+            indices = range(len(self.records))
+        return [self.record_dict(i) for i in indices]
+
+
+def diff_stores(old: PaperStore, new: PaperStore) -> StoreDiff:
+    """比较两个版本的数据集，找出新增、删除和修改的论文"""
+    old_rows = {r.no: fp for r, fp in zip(old.records, old.row_fingerprints())}
+    new_rows = {r.no: fp for r, fp in zip(new.records, new.row_fingerprints())}
+    added = [no for no in new_rows if no not in old_rows]
+    removed = [no for no in old_rows if no not in new_rows]
+    changed = [no for no, fp in new_rows.items() if no in old_rows and old_rows[no] != fp]
+    unchanged = len(new_rows) - len(added) - len(changed)
+    return StoreDiff(added, removed, changed, unchanged)
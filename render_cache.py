@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+渲染结果缓存
+按渲染输入（数据集哈希、图片类型、尺寸、DPI、生成器版本）的哈希寻址，
+文件保存在磁盘上，超过容量上限时按最近使用时间淘汰
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_RENDER_CACHE_DIR = Path(".cache") / "renders"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def render_key(**parts) -> str:
+    """把渲染参数规范化后取哈希，作为缓存键和ETag"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """内容寻址、容量受限的LRU磁盘缓存"""
+
+    def __init__(self, cache_dir=DEFAULT_RENDER_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 suffix: str = '.png'):
+        self.cache_dir = Path(cache_dir).absolute()
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+
+    def path_for(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.suffix}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        命中时刷新访问时间（用mtime记录LRU顺序）并返回文件内容
+        直接读出字节而不是返回路径：文件打开后即使被并发的淘汰删除也能读完，
+        打开前已被删除则视为未命中
+        """
+        path = self.path_for(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, data: bytes) -> Path:
+        """写入渲染结果（原子替换），然后按容量淘汰"""
+        path = self.path_for(key)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.evict()
+        return path
+
+    def evict(self):
+        """总大小超过上限时删除最久未使用的条目"""
+        with self._lock:
+            entries = []
+            total = 0
+            for path in self.cache_dir.glob(f"*{self.suffix}"):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, path))
+                total += st.st_size
+
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    path.unlink()
+                    total -= size
+                except OSError:
+                    pass
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+渲染配置
+API服务器只需要这些常量来计算缓存键，单独放在这里，避免为此导入整个绘图模块
+"""
+
+# 生成器版本（布局、配色或绘制逻辑变化时递增，使渲染缓存失效）
+GENERATOR_VERSION = 2
+
+# 网页预览缩略图宽度（像素）
+THUMBNAIL_WIDTH = 480
+
+# 图片预设：类型 -> (宽度英寸, 高度英寸, DPI)
+IMAGE_PRESETS = {
+    'publication': (20, 28, 300),
+    'presentation': (16, 22, 200),
+}
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+异步渲染任务队列
+固定大小的线程池执行渲染；相同缓存键的并发请求合并为同一个任务（single-flight），
+并记录队列深度和渲染耗时，便于确定线程池大小
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Optional
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+# 保留的已结束任务数（供状态查询和下载）
+DEFAULT_MAX_FINISHED_JOBS = 256
+# 统计耗时分位数时使用的最近样本数
+LATENCY_WINDOW = 200
+
+
+@dataclass
+class RenderJob:
+    """一个渲染任务"""
+    id: str
+    key: str
+    params: Dict
+    status: str = QUEUED
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    result: Optional[object] = None
+    error: Optional[str] = None
+    future: Optional[Future] = field(default=None, repr=False)
+
+    def to_dict(self) -> Dict:
+        """任务状态（不含渲染结果本身）"""
+        info = {
+            'job_id': self.id,
+            'status': self.status,
+            'params': self.params,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+            'queue_seconds': None,
+            'render_seconds': None,
+        }
+        if self.started is not None:
+            info['queue_seconds'] = round(self.started - self.created, 4)
+        if self.started is not None and self.finished is not None:
+            info['render_seconds'] = round(self.finished - self.started, 4)
+        if self.error:
+            info['error'] = self.error
+        return info
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return round(ordered[index], 4)
+
+
+class RenderJobQueue:
+    """有界线程池 + 按缓存键去重的渲染任务队列"""
+
+    def __init__(self, max_workers: int = 1, max_finished: int = DEFAULT_MAX_FINISHED_JOBS):
+        """
+        Args:
+            max_workers: 渲染线程数
+            max_finished: 最多保留多少个已结束的任务
+        """
+        self.max_workers = max_workers
+        self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='render')
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, RenderJob] = {}
+        self._active: Dict[str, RenderJob] = {}
+        self._finished: 'OrderedDict[str, None]' = OrderedDict()
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._waits: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.submitted = 0
+        self.coalesced = 0
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, key: str, render: Callable[[], object], params: Optional[Dict] = None) -> RenderJob:
+        """
+        提交渲染任务；同一缓存键已有排队或执行中的任务时直接返回该任务
+
+        Args:
+            key: 渲染缓存键（相同键的渲染结果相同）
+            render: 在渲染线程中执行的函数，返回值作为任务结果
+            params: 渲染参数（仅用于状态展示）
+        """
+        with self._lock:
+            job = self._active.get(key)
+            if job is not None:
+                self.coalesced += 1
+                return job
+
+            job = RenderJob(id=uuid.uuid4().hex, key=key, params=dict(params or {}))
+            self._jobs[job.id] = job
+            self._active[key] = job
+            self.submitted += 1
+            job.future = self._executor.submit(self._run, job, render)
+            return job
+
+    def _run(self, job: RenderJob, render: Callable[[], object]):
+        job.started = time.time()
+        job.status = RUNNING
+        try:
+            result = render()
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+            raise
+        else:
+            job.result = result
+            job.status = DONE
+            return result
+        finally:
+            job.finished = time.time()
+            with self._lock:
+                self._active.pop(job.key, None)
+                self._waits.append(job.started - job.created)
+                if job.status == DONE:
+                    self.completed += 1
+                    self._latencies.append(job.finished - job.started)
+                else:
+                    self.failed += 1
+                self._finished[job.id] = None
+                while len(self._finished) > self.max_finished:
+                    old_id, _ = self._finished.popitem(last=False)
+                    self._jobs.pop(old_id, None)
+
+    def get(self, job_id: str) -> Optional[RenderJob]:
+        return self._jobs.get(job_id)
+
+    def wait(self, job: RenderJob, timeout: Optional[float] = None):
+        """等待任务结束并返回结果（渲染失败时抛出原异常）"""
+        return job.future.result(timeout)
+
+    def metrics(self) -> Dict:
+        """队列深度、吞吐和渲染耗时"""
+        with self._lock:
+            active = list(self._active.values())
+            latencies = list(self._latencies)
+            waits = list(self._waits)
+            return {
+                'workers': self.max_workers,
+                'queued': sum(1 for job in active if job.status == QUEUED),
+                'running': sum(1 for job in active if job.status == RUNNING),
+                'submitted': self.submitted,
+                'coalesced': self.coalesced,
+                'completed': self.completed,
+                'failed': self.failed,
+                'render_seconds': {
+                    'samples': len(latencies),
+                    'mean': round(sum(latencies) / len(latencies), 4) if latencies else None,
+                    'p50': _percentile(latencies, 0.5),
+                    'p95': _percentile(latencies, 0.95),
+                    'max': round(max(latencies), 4) if latencies else None,
+                },
+                'queue_seconds': {
+                    'samples': len(waits),
+                    'p50': _percentile(waits, 0.5),
+                    'p95': _percentile(waits, 0.95),
+                },
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+预热的渲染工作进程
+与API服务器一同启动：每个工作进程在启动时导入绘图库、解析字体回退链、加载并预缩放图标，
+之后通过进程池的本地管道接收渲染任务，第一次请求与稳定状态的耗时一致。
+渲染任务只携带数据集哈希，工作进程缓存未命中时从数据集磁盘缓存加载
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from functools import partial
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Sequence
+
+# 工作进程内按数据集哈希缓存的生成器（数据集变化后替换）
+_generator = None
+_generator_hash = None
+
+
+class DatasetUnavailable(Exception):
+    """工作进程无法从磁盘缓存得到指定哈希的数据集（CSV已再次变化或无法读取）"""
+
+
+def _warm_up(csv_file: str):
+    """工作进程初始化：把首次渲染才会付出的开销提前到启动时"""
+    from bibtex_citation_manager import PaperCitationManager
+    from complete_41_papers_generator import ICON_SIZE_POINTS, _font_family
+    from dataset_cache import load_dataset
+    from paper_store import PaperStore
+    from render_config import IMAGE_PRESETS
+
+    start = time.perf_counter()
+    # 字体管理器和回退链
+    _font_family()
+    # 为当前数据集预先创建生成器（数据读自磁盘缓存，与API进程中的快照哈希一致）
+    try:
+        store, citation_manager = load_dataset(csv_file)
+    except Exception as e:
+        print(f"⚠️ 渲染进程预加载数据失败: {e}")
+        store, citation_manager = PaperStore.from_rows([], [], source=csv_file), PaperCitationManager([])
+    generator = _generator_for(csv_file, store.content_hash(), (store, citation_manager))
+    # 图标解码（磁盘缓存）和各预设DPI下的预缩放
+    for _, _, dpi in IMAGE_PRESETS.values():
+        size_px = max(1, round(ICON_SIZE_POINTS * dpi / 72))
+        for level in ('automate', 'augment', 'assist'):
+            generator.icon_atlas.scaled(level, size_px)
+    # 用小尺寸走一遍完整的绘制和PNG编码路径
+    generator.render_image(None, 4, 4, 72)
+    print(f"🔥 渲染进程 {os.getpid()} 预热完成 ({time.perf_counter() - start:.2f}s)")
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+def _generator_for(csv_file: str, dataset_hash: str, dataset=None):
+    """
+    同一数据集只创建一次生成器
+    未提供 dataset 时从磁盘缓存加载，内容哈希不一致时抛出 DatasetUnavailable
+    """
+    global _generator, _generator_hash
+    if _generator is None or _generator_hash != dataset_hash:
+        if dataset is None:
+            from dataset_cache import load_dataset
+            try:
+                dataset = load_dataset(csv_file)
+            except Exception as e:
+                raise DatasetUnavailable(f"{dataset_hash}: {e}")
+            if dataset[0].content_hash() != dataset_hash:
+                raise DatasetUnavailable(dataset_hash)
+        from complete_41_papers_generator import Complete41PapersTableGenerator
+        _generator = Complete41PapersTableGenerator(csv_file, dataset=dataset)
+        _generator_hash = dataset_hash
+    return _generator
+
+
+def _render_resolutions(csv_file, dataset_hash, dataset, preset, dpis, thumbnail_width):
+    image_width, image_height, _ = preset
+    generator = _generator_for(csv_file, dataset_hash, dataset)
+    return generator.render_resolutions(image_width, image_height, dpis, thumbnail_width)
+
+
+def _downsample(png_bytes, scale, width, dpi):
+    from complete_41_papers_generator import downsample_png
+    return downsample_png(png_bytes, scale=scale, width=width, dpi=dpi)
+
+
+class RenderWorkerPool:
+    """一组预热的渲染进程"""
+
+    def __init__(self, csv_file: str, max_workers: int = 1):
+        self.csv_file = csv_file
+        self.max_workers = max_workers
+        self.ready_workers = 0
+        self._lock = threading.Lock()
+        self._executor = self._new_executor()
+        self._started = False
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # 服务器进程中有后台线程，用 spawn 启动工作进程，避免 fork 继承锁状态
+        return ProcessPoolExecutor(max_workers=self.max_workers,
+                                   mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=_warm_up, initargs=(self.csv_file,))
+
+    def _call(self, fn, *args):
+        """在工作进程中执行；有进程异常退出导致进程池失效时重建进程池、重新预热并重试一次"""
+        if not self._started:
+            self.start()
+        executor = self._executor
+        try:
+            return executor.submit(fn, *args).result()
+        except BrokenProcessPool:
+            rebuilt = False
+            with self._lock:
+                if self._executor is executor:
+                    print("⚠️ 渲染进程异常退出，正在重启...")
+                    self.ready_workers = 0
+                    self._executor = self._new_executor()
+                    rebuilt = True
+            if rebuilt:
+                self.start()
+            return self._executor.submit(fn, *args).result()
+
+    def start(self, block: bool = False):
+        """立即启动并预热所有工作进程（默认不等待预热完成）"""
+        executor = self._executor
+        self._started = True
+        futures = [executor.submit(_ready) for _ in range(self.max_workers)]
+        for future in futures:
+            future.add_done_callback(partial(self._on_ready, executor))
+        if block:
+            wait(futures)
+        return self
+
+    def _on_ready(self, executor, future):
+        if future.exception() is not None:
+            print(f"❌ 渲染进程启动失败: {future.exception()}")
+            return
+        with self._lock:
+            # 重建之前的进程池完成预热时不再计数
+            if executor is self._executor:
+                self.ready_workers += 1
+
+    def render_resolutions(self, dataset_hash: str, preset, dpis: Sequence[int],
+                           thumbnail_width: Optional[int] = None, dataset=None) -> Dict:
+        """
+        在工作进程中单次渲染多种分辨率（见 Complete41PapersTableGenerator.render_resolutions）
+
+        任务只携带数据集哈希；工作进程从磁盘缓存得不到该版本的数据时，
+        才把 dataset（store, citation_manager）发送过去重试
+        """
+        args = (preset, list(dpis), thumbnail_width)
+        try:
+            return self._call(_render_resolutions, self.csv_file, dataset_hash, None, *args)
+        except DatasetUnavailable:
+            if dataset is None:
+                raise
+            return self._call(_render_resolutions, self.csv_file, dataset_hash, dataset, *args)
+
+    def downsample(self, png_bytes: bytes, scale=None, width=None, dpi=None) -> bytes:
+        """在工作进程中把PNG缩小（见 downsample_png）"""
+        return self._call(_downsample, png_bytes, scale, width, dpi)
+
+    def status(self) -> Dict:
+        return {'workers': self.max_workers, 'ready': self.ready_workers}
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
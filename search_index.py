@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+论文全文检索
+对标题、作者、会议（含年份）和领域（中文原文及英文翻译）分词后建立倒排索引，
+查询词按前缀匹配词表（有序词表上二分查找），多个查询词要求同时命中，
+结果按 BM25 风格的字段加权得分排序。索引随数据集快照在加载和重新加载时重建
+"""
+
+import bisect
+import math
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from domain_map import DOMAIN_ZH2EN
+from paper_store import PaperStore
+
+# 词项：单个汉字，或连续的字母数字
+_TERM_RE = re.compile(r'[㐀-鿿]|[^\W_㐀-鿿]+', re.UNICODE)
+
+# 各字段的权重
+FIELD_WEIGHTS = (
+    ('title', 3.0),
+    ('author', 2.0),
+    ('domain', 1.5),
+    ('venue', 1.0),
+)
+
+# 词频饱和参数（BM25 的 k1）
+TERM_SATURATION = 1.2
+# 前缀匹配（而非完整词）的得分折扣
+PREFIX_DISCOUNT = 0.7
+# 大于任何字符的码位：以 prefix 开头的词都排在 prefix 与 prefix + _MAX_CHAR 之间
+_MAX_CHAR = chr(0x10FFFF)
+
+DEFAULT_SEARCH_LIMIT = 20
+
+
+def tokenize(text: str) -> List[str]:
+    """拆分出小写词项"""
+    return _TERM_RE.findall(text.casefold())
+
+
+def _field_texts(record) -> Dict[str, str]:
+    """参与检索的各字段文本"""
+    domain = record.specific_domain
+    return {
+        'title': record.title,
+        'author': record.author,
+        'venue': f"{record.venue} {record.year}",
+        'domain': f"{domain} {DOMAIN_ZH2EN.get(domain, '')} {record.domain_category}",
+    }
+
+
+class SearchIndex:
+    """某一版本数据集的倒排索引（创建后不再修改，随快照整体替换）"""
+
+    def __init__(self, store: PaperStore):
+        self.size = len(store)
+        weights: Dict[str, Dict[int, float]] = {}
+        for row, record in enumerate(store.records):
+            texts = _field_texts(record)
+            for field, weight in FIELD_WEIGHTS:
+                for term in tokenize(texts[field]):
+                    postings = weights.setdefault(term, {})
+                    postings[row] = postings.get(row, 0.0) + weight
+
+        # 行号按升序加入，各词的行号表天然有序；词表有序，前缀查询在其上二分查找
+        self.vocabulary = sorted(weights)
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for term, postings in weights.items():
+            rows = np.fromiter(postings.keys(), dtype=np.int32, count=len(postings))
+            tf = np.fromiter(postings.values(), dtype=np.float32, count=len(postings))
+            idf = math.log(1 + (self.size - len(rows) + 0.5) / (len(rows) + 0.5))
+            scores = idf * tf * (TERM_SATURATION + 1) / (tf + TERM_SATURATION)
+            self._postings[term] = (rows, scores.astype(np.float32))
+
+    def expand(self, prefix: str) -> List[str]:
+        """以 prefix 开头的全部词表项（两次二分查找确定有序词表中的区间）"""
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        end = bisect.bisect_left(self.vocabulary, prefix + _MAX_CHAR, start)
+        return self.vocabulary[start:end]
+
+    def _term_scores(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """单个查询词命中的行号（升序）和得分（前缀展开的各词取最高分）"""
+        parts = []
+        for candidate in self.expand(term):
+            rows, scores = self._postings[candidate]
+            parts.append((rows, scores if candidate == term else scores * PREFIX_DISCOUNT))
+        if not parts:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+        if len(parts) == 1:
+            return parts[0]
+        rows = np.concatenate([p[0] for p in parts])
+        scores = np.concatenate([p[1] for p in parts])
+        unique_rows, inverse = np.unique(rows, return_inverse=True)
+        best = np.zeros(len(unique_rows), dtype=np.float32)
+        np.maximum.at(best, inverse, scores)
+        return unique_rows, best
+
+    def score(self, query: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        全部查询词都命中的行号（升序）及总得分；查询为空时返回 None
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return None
+        rows, total = None, None
+        # 从命中最少的词开始求交集
+        for term_rows, term_scores in sorted((self._term_scores(t) for t in terms), key=lambda p: len(p[0])):
+            if rows is None:
+                rows, total = term_rows, term_scores.astype(np.float64)
+                continue
+            rows, left, right = np.intersect1d(rows, term_rows, assume_unique=True, return_indices=True)
+            total = total[left] + term_scores[right]
+            if not len(rows):
+                break
+        return rows, total
+
+    def match(self, query: str) -> Optional[np.ndarray]:
+        """全部查询词都命中的行号（升序）；查询为空时返回 None"""
+        result = self.score(query)
+        return None if result is None else result[0]
+
+    def search(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        按得分排序的检索结果
+
+        Returns:
+            (前 limit 个行号, 对应得分, 命中总数)；得分相同时按数据表顺序
+        """
+        result = self.score(query)
+        if result is None:
+            empty = np.zeros(0, dtype=np.int32)
+            return empty, np.zeros(0), 0
+        matched, scores = result
+        if limit < len(matched):
+            # 只对前 limit 名完整排序
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            matched, scores = matched[top], scores[top]
+        order = np.lexsort((matched, -scores))
+        return matched[order], scores[order], len(result[0])
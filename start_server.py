@@ -3,27 +3,32 @@
 启动API服务器和前端页面
 """
 
+import importlib.util
 import subprocess
 import sys
 import time
 import webbrowser
 from pathlib import Path
 
+# 运行所需的包：导入名 -> pip包名
+REQUIRED_PACKAGES = {
+    'flask': 'flask',
+    'flask_cors': 'flask-cors',
+    'matplotlib': 'matplotlib',
+    'numpy': 'numpy',
+    'PIL': 'pillow',
+}
+
 def check_dependencies():
-    """检查依赖是否安装"""
-    try:
-        import flask
-        import flask_cors
-        import pandas
-        import matplotlib
-        import seaborn
-        import numpy
-        print("✅ 所有依赖已安装")
-        return True
-    except ImportError as e:
-        print(f"❌ 缺少依赖: {e}")
+    """检查依赖是否安装（只查找包，不导入，启动时不加载绘图库）"""
+    missing = [pip_name for module, pip_name in REQUIRED_PACKAGES.items()
+               if importlib.util.find_spec(module) is None]
+    if missing:
+        print(f"❌ 缺少依赖: {', '.join(missing)}")
         print("请运行: pip install -r requirements.txt")
         return False
+    print("✅ 所有依赖已安装")
+    return True
 
 def main():
     print("🚀 启动完整41篇论文表格生成器")
@@ -55,7 +60,7 @@ def main():
     # 启动API服务器
     print("\n🌐 启动API服务器...")
     try:
-        from api_server import app
+        from api_server import app, start_render_workers
         print("📊 服务器地址: http://localhost:8081")
         print("🔗 API端点:")
         print("   GET /api/papers - 获取论文数据")
@@ -75,7 +80,8 @@ def main():
         import threading
         threading.Thread(target=open_browser).start()
         
-        # 启动Flask应用
+        # 预热渲染进程，然后启动Flask应用
+        start_render_workers()
         app.run(debug=True, host='0.0.0.0', port=8081)
         
     except Exception as e:
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+文本测量
+用表格实际使用的字体回退链、按Agg渲染时相同的字形提示计算字符串宽度，
+结果按 (字体, 字号, DPI) 缓存，换行和截断在绘制前即可精确算出
+"""
+
+import re
+from functools import lru_cache
+from typing import List, Sequence, Tuple
+
+from matplotlib.backends.backend_agg import get_hinting_flag
+from matplotlib.font_manager import FontProperties, findfont, get_font
+
+ELLIPSIS = '...'
+
+# 可在任意两个字符之间断行的文字（中日韩文字和全角符号）
+_CJK_CHARS = '⺀-鿿가-힯豈-﫿＀-￯'
+# 断行单元：一个中日韩字符，或一段不含空白的其他字符；记录前面是否有空白
+_TOKEN_RE = re.compile(rf'(\s*)([{_CJK_CHARS}]|[^\s{_CJK_CHARS}]+)')
+
+
+@lru_cache(maxsize=None)
+def _font_paths(families: Tuple[str, ...], weight: str) -> Tuple[str, ...]:
+    """字体回退链中每个字体族对应的字体文件"""
+    paths = []
+    for family in families:
+        path = findfont(FontProperties(family=[family], weight=weight))
+        if path not in paths:
+            paths.append(path)
+    return tuple(paths)
+
+
+@lru_cache(maxsize=65536)
+def _text_width(families: Tuple[str, ...], weight: str, size: float, dpi: float, text: str) -> float:
+    """字符串在给定字号和DPI下的渲染宽度（磅）"""
+    font = get_font(list(_font_paths(families, weight)))
+    font.set_size(size, dpi)
+    font.set_text(text, 0.0, flags=get_hinting_flag())
+    width, _ = font.get_width_height()
+    return width / 64.0 * 72.0 / dpi
+
+
+class TextMeasurer:
+    """按字体回退链测量、换行和截断文本，宽度单位均为磅"""
+
+    def __init__(self, families: Sequence[str], dpi: float):
+        """
+        Args:
+            families: 字体回退链（与绘制文本时使用的一致）
+            dpi: 渲染分辨率（字形提示使宽度随DPI略有变化）
+        """
+        self.families = tuple(families)
+        self.dpi = dpi
+
+    def width(self, text: str, size: float, weight: str = 'normal') -> float:
+        if not text:
+            return 0.0
+        return _text_width(self.families, weight, size, self.dpi, text)
+
+    def truncate(self, text: str, max_width: float, size: float, weight: str = 'normal',
+                 force_ellipsis: bool = False) -> str:
+        """
+        截断到不超过 max_width，被截断时末尾加省略号
+
+        Args:
+            force_ellipsis: 即使放得下也加省略号（用于多行文本的最后一行）
+        """
+        if not force_ellipsis and self.width(text, size, weight) <= max_width:
+            return text
+
+        # 二分查找能和省略号一起放下的最长前缀
+        low, high = 0, len(text)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if self.width(text[:mid].rstrip() + ELLIPSIS, size, weight) <= max_width:
+                low = mid
+            else:
+                high = mid - 1
+        if low == 0 and self.width(ELLIPSIS, size, weight) > max_width:
+            return ''
+        return text[:low].rstrip() + ELLIPSIS
+
+    def wrap(self, text: str, max_width: float, size: float, max_lines: int = None,
+             weight: str = 'normal') -> List[str]:
+        """
+        按实际宽度换行：英文在空白处断行，中日韩文字可在任意字符间断行，
+        单个词比一行还宽时按字符拆开；超过 max_lines 时最后一行截断加省略号
+        """
+        lines: List[str] = []
+        line = ''
+        for match in _TOKEN_RE.finditer(text):
+            space, token = match.groups()
+            candidate = line + (' ' if space and line else '') + token
+            if self.width(candidate, size, weight) <= max_width:
+                line = candidate
+                continue
+            if line:
+                lines.append(line)
+            line = ''
+            # 过长的词逐字符填充
+            for char in token:
+                if line and self.width(line + char, size, weight) > max_width:
+                    lines.append(line)
+                    line = ''
+                line += char
+        if line:
+            lines.append(line)
+
+        if max_lines is not None and len(lines) > max_lines:
+            lines = lines[:max_lines]
+            lines[-1] = self.truncate(lines[-1], max_width, size, weight, force_ellipsis=True)
+        return lines
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+论文列表的列式传输格式
+每个字段一个数组，会议/年份/自动化级别/领域等重复值多的字段做字典编码，
+17个标志位按列顺序打包成一个整数位掩码（第 i 位对应 flags.labels[i]）。
+与 /api/papers 的行格式包含相同的信息（页面中的解码器见 表格生成器.html 的 decodeColumnarPapers）
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from flag_query import FLAG_NAMES
+from paper_store import FLAG_GROUPS, PaperStore
+
+COLUMNAR_FORMAT = 'columnar'
+COLUMNAR_VERSION = 1
+
+# 行格式中的键 -> PaperStore 字典编码字段
+DICTIONARY_COLUMNS = {
+    'venue': 'venue',
+    'year': 'year',
+    'automation': 'automation',
+    'application': 'domain_category',
+    'domain': 'specific_domain',
+}
+
+
+def _dictionary_column(store: PaperStore, field: str, rows: Optional[np.ndarray]) -> Dict:
+    codes = store.codes[field]
+    categories = store.categories[field]
+    if rows is None:
+        return {'dictionary': categories, 'codes': codes.tolist()}
+    # 只保留本页用到的值
+    used, remapped = np.unique(codes[rows], return_inverse=True)
+    return {'dictionary': [categories[code] for code in used], 'codes': remapped.tolist()}
+
+
+def encode_columnar(store: PaperStore, masks: np.ndarray, rows: Optional[Sequence[int]] = None) -> Dict:
+    """
+    把论文列表编码为列式结构
+
+    Args:
+        store: 列式数据集
+        masks: 每行的标志位掩码（flag_query.pack_flags 的结果）
+        rows: 只编码这些行（按给定顺序）；默认全部
+    """
+    if rows is not None:
+        rows = np.asarray(rows, dtype=np.int64)
+    records = store.records if rows is None else [store.records[i] for i in rows]
+    columns = {
+        'no': [int(r.no) if r.no.isdigit() else r.no for r in records],
+        'title': [r.title for r in records],
+        'author': [r.author for r in records],
+    }
+    for key, field in DICTIONARY_COLUMNS.items():
+        columns[key] = _dictionary_column(store, field, rows)
+    return {
+        'format': COLUMNAR_FORMAT,
+        'format_version': COLUMNAR_VERSION,
+        'count': len(records),
+        'columns': columns,
+        'flags': {
+            'labels': FLAG_NAMES,
+            'groups': {group: [s.start, s.stop] for group, s in FLAG_GROUPS.items()},
+            'masks': (masks if rows is None else masks[rows]).tolist(),
+        },
+    }